@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+"""This module contains array-aware counterparts of
+sum_list, sum_mixed_list and make_multiplier, working on
+whole buffers (array.array, memoryview or NumPy arrays).
+NumPy is optional; when installed, contiguous buffers are
+processed in place without copying them.
+"""
+
+import math
+import sys
+import time
+from array import array
+from typing import Any, Callable, Dict, Iterable, Union
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+Numbers = Union[Iterable[float], memoryview, array]
+
+
+def _as_ndarray(values: Any) -> Any:
+    """returns a NumPy view sharing the memory of values,
+    or None when NumPy is missing, values is not a buffer
+    or NumPy cannot view it, e.g. a strided memoryview
+
+    Args:
+        values (Any): a NumPy array or an object exposing
+            the buffer protocol
+
+    Returns:
+        Any: the NumPy array, or None
+    """
+    if numpy is None:
+        return None
+    if isinstance(values, numpy.ndarray):
+        return values
+    try:
+        view = memoryview(values)
+    except TypeError:
+        return None
+    if not view.c_contiguous:
+        return None
+    try:
+        return numpy.frombuffer(view, dtype=view.format)
+    except (BufferError, TypeError, ValueError):
+        return None
+
+
+def sum_array(values: Numbers, exact: bool = False) -> float:
+    """takes floats or ints, in a list or in a buffer,
+    and returns their sum as a float, like sum_list and
+    sum_mixed_list
+
+    Contiguous buffers are summed by NumPy when it is
+    installed, with pairwise summation; otherwise, or with
+    exact, math.fsum reads them in place and returns the
+    correctly rounded sum
+
+    Args:
+        values (Numbers): the numbers to sum
+        exact (bool, optional): whether to use math.fsum
+            even when NumPy is installed. Defaults to False.
+
+    Returns:
+        float: sum of the numbers
+    """
+    ndarray = None if exact else _as_ndarray(values)
+    if ndarray is not None:
+        return float(ndarray.sum(dtype=numpy.float64))
+    return math.fsum(values)
+
+
+def make_multiplier_inplace(multiplier: float) -> Callable[[Any], Any]:
+    """takes a floating-point number and returns a
+    function that multiplies a whole buffer of floats
+    by it, in place
+
+    Args:
+        multiplier (float): the multiplicator
+
+    Returns:
+        Callable[[Any], Any]: a reference to the multiplicate
+            function
+    """
+
+    def multiplicate(values: Any) -> Any:
+        """Takes in an array('d'), a writable memoryview of
+        floats or a NumPy array, multiplies each of its
+        elements by multiplier and returns it
+
+        Only NumPy multiplies in place without copying; a
+        strided view, or any buffer without NumPy, is read
+        into a list and a new array that is copied back, no
+        faster than the scalar closure
+
+        Args:
+            values (Any): the buffer to multiply, updated
+                in place
+
+        Returns:
+            Any: the given buffer
+        """
+        ndarray = _as_ndarray(values)
+        if ndarray is not None:
+            numpy.multiply(ndarray, multiplier, out=ndarray)
+            return values
+        view = memoryview(values)
+        view[:] = array(view.format, [multiplier * number
+                                      for number in view])
+        return values
+
+    return multiplicate
+
+
+def benchmark(size: int = 1000000) -> Dict[str, float]:
+    """times the scalar helpers on a list against the
+    array-aware ones on an array('d') of the same floats
+
+    Args:
+        size (int, optional): the number of floats.
+            Defaults to 1000000.
+
+    Returns:
+        Dict[str, float]: the runtime of each helper,
+            in seconds
+    """
+    sum_list = __import__('5-sum_list').sum_list
+    make_multiplier = __import__('8-make_multiplier').make_multiplier
+    numbers = [index / 7 for index in range(size)]
+    buffer = array('d', numbers)
+    scalar_multiplier = make_multiplier(1.5)
+    buffer_multiplier = make_multiplier_inplace(1.5)
+    runs: Dict[str, Callable[[], Any]] = {
+        "sum_list": lambda: sum_list(numbers),
+        "sum_array": lambda: sum_array(buffer),
+        "sum_array exact": lambda: sum_array(buffer, exact=True),
+        "make_multiplier": lambda: [scalar_multiplier(number)
+                                    for number in numbers],
+        "make_multiplier_inplace": lambda: buffer_multiplier(buffer),
+    }
+    timings: Dict[str, float] = {}
+    for name, run in runs.items():
+        started_at = time.perf_counter()
+        run()
+        timings[name] = time.perf_counter() - started_at
+    return timings
+
+
+if __name__ == "__main__":
+    print("numpy:", "yes" if numpy is not None else "no")
+    for name, seconds in benchmark(*map(int, sys.argv[1:2])).items():
+        print("{:>24} {:.4f}s".format(name, seconds))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+"""This module contains a ZoomView class, a lazy
+counterpart of zoom_array computing its items from the
+original Tuple on the fly, and a zoom_repeat function
+materializing the zoomed data in one pass
+"""
+
+from array import array
+from itertools import chain, repeat
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ZoomView(Sequence):
+    """read-only sequence equal to zoom_array(lst, factor),
+    where each item of the Tuple is repeated factor times,
+    without building the larger list; slices are views too
+
+    Args:
+        lst (Tuple): the Tuple to enlarge
+        factor (int, optional): the factor. Defaults to 2.
+    """
+
+    def __init__(self, lst: Tuple, factor: int = 2) -> None:
+        """Init method of ZoomView"""
+        if factor < 0:
+            raise ValueError("factor must not be negative")
+        self.lst = lst
+        self.factor = factor
+        # positions in the zoomed data, narrowed by slicing
+        self._positions = range(len(lst) * factor)
+
+    def __len__(self) -> int:
+        """returns the length of the zoomed data"""
+        return len(self._positions)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        """returns the item at index of the zoomed data, or
+        a ZoomView of a slice of it, sharing the Tuple
+
+        Args:
+            index (Union[int, slice]): the index or slice
+
+        Returns:
+            Any: the item, or the ZoomView of the slice
+        """
+        if isinstance(index, slice):
+            view = ZoomView(self.lst, self.factor)
+            view._positions = self._positions[index]
+            return view
+        try:
+            position = self._positions[index]
+        except IndexError:
+            raise IndexError("ZoomView index out of range") from None
+        return self.lst[position // self.factor]
+
+    def __iter__(self) -> Iterator:
+        """iterates over the zoomed data"""
+        if self._positions == range(len(self.lst) * self.factor):
+            return chain.from_iterable(repeat(item, self.factor)
+                                       for item in self.lst)
+        return (self.lst[position // self.factor]
+                for position in self._positions)
+
+    def __eq__(self, other: object) -> bool:
+        """compares the zoomed data with a List, Tuple or
+        another ZoomView, item by item"""
+        if not isinstance(other, (list, tuple, ZoomView)):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            mine == theirs for mine, theirs in zip(self, other))
+
+    def __repr__(self) -> str:
+        """returns the representation of the view"""
+        text = "ZoomView({!r}, factor={})".format(self.lst, self.factor)
+        positions = self._positions
+        if positions != range(len(self.lst) * self.factor):
+            text += "[{}:{}:{}]".format(positions.start, positions.stop,
+                                        positions.step)
+        return text
+
+
+def zoom_repeat(lst: Sequence, factor: int = 2,
+                typecode: Optional[str] = None) -> Any:
+    """returns the same items as zoom_array(lst, factor),
+    filled by factor strided slice assignments rather than
+    one Python step per item
+
+    Args:
+        lst (Sequence): the items to enlarge
+        factor (int, optional): the factor. Defaults to 2.
+        typecode (str, optional): the typecode of an array
+            to return instead of a List, or "numpy" for a
+            NumPy array. Defaults to None.
+
+    Returns:
+        Any: the List, array or NumPy array generated from
+            the given items
+    """
+    if typecode == "numpy":
+        if numpy is None:
+            raise ImportError("zoom_repeat(typecode='numpy') needs numpy")
+        return numpy.repeat(numpy.asarray(lst), factor)
+    if typecode is None:
+        zoomed_in: Union[List, array] = [None] * (len(lst) * factor)
+        items: Sequence = lst
+    else:
+        zoomed_in = array(typecode, [0]) * (len(lst) * factor)
+        items = array(typecode, lst)
+    for offset in range(factor):
+        zoomed_in[offset::factor] = items
+    return zoomed_in
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+"""
+This module contains unit tests for the array-aware helpers
+in the '103-array_helpers' module.
+"""
+
+import unittest
+from array import array
+array_helpers = __import__('103-array_helpers')
+
+
+class TestArrayHelpers(unittest.TestCase):
+    """
+    Test case for sum_array and make_multiplier_inplace.
+    """
+
+    def test_sum_array(self) -> None:
+        """
+        Test that lists, arrays and memoryviews are summed alike.
+
+        Returns:
+            None
+        """
+        values = array('d', [0.1] * 10)
+        for numbers in (list(values), values, memoryview(values)):
+            with self.subTest(numbers=type(numbers).__name__):
+                self.assertEqual(array_helpers.sum_array(numbers), 1.0)
+
+    def test_strided_view(self) -> None:
+        """
+        Test that a strided memoryview, which NumPy cannot view without
+        copying, is summed and multiplied in place.
+
+        Returns:
+            None
+        """
+        values = array('d', [1.0, 10.0, 3.0, 10.0])
+        view = memoryview(values)[::2]
+
+        self.assertEqual(array_helpers.sum_array(view), 4.0)
+        self.assertIs(array_helpers.make_multiplier_inplace(2.0)(view),
+                      view)
+        self.assertEqual(values, array('d', [2.0, 10.0, 6.0, 10.0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+"""
+This module contains a bounded version of asyncio.as_completed and
+a variant of wait_n that streams the delays as they complete.
+
+Functions:
+    - as_completed_bounded(aws, limit, timeout, return_exceptions):
+    An asynchronous iterator that runs at most limit awaitables at a time
+    and yields their results in completion order.
+    - wait_n_stream(n, max_delay, limit, timeout):
+    An asynchronous iterator over n random delays, in completion order.
+"""
+
+import asyncio
+from itertools import islice
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Iterable,
+    Optional,
+    Set,
+)
+wait_random = __import__('0-basic_async_syntax').wait_random
+
+
+async def as_completed_bounded(aws: Iterable[Awaitable[Any]],
+                               limit: int = 100,
+                               timeout: Optional[float] = None,
+                               return_exceptions: bool = False
+                               ) -> AsyncIterator[Any]:
+    """
+    Runs the given awaitables with at most limit of them in flight, and
+    yields their results as they complete.
+
+    The awaitables are pulled from aws only when a slot frees up, so a
+    generator of coroutines keeps memory bounded whatever their number.
+    Leaving the loop early, or cancelling the consumer, cancels the
+    awaitables still running.
+
+    Args:
+        aws (Iterable[Awaitable]): The awaitables to run, possibly lazy.
+        limit (int): The maximum number of awaitables in flight.
+        timeout (float): The maximum time of each awaitable, in seconds;
+            a late one is cancelled and fails with asyncio.TimeoutError.
+        return_exceptions (bool): Whether to yield the exception of a
+            failed awaitable instead of raising it.
+
+    Yields:
+        Any: The result of each awaitable, in completion order.
+    """
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    aws = iter(aws)
+    pending: Set[asyncio.Future] = set()
+    # done callbacks queue finished tasks, unlike asyncio.wait which
+    # walks every pending task on each completion
+    done: asyncio.Queue = asyncio.Queue()
+
+    def fill() -> None:
+        """Starts awaitables until limit of them are in flight."""
+        for aw in islice(aws, limit - len(pending)):
+            if timeout is not None:
+                aw = asyncio.wait_for(aw, timeout)
+            task = asyncio.ensure_future(aw)
+            task.add_done_callback(done.put_nowait)
+            pending.add(task)
+
+    try:
+        fill()
+        while pending:
+            task = await done.get()
+            pending.discard(task)
+            # refill before yielding so the slot stays busy meanwhile
+            fill()
+            if task.exception() is None:
+                yield task.result()
+            elif return_exceptions:
+                yield task.exception()
+            else:
+                raise task.exception()
+    finally:
+        for task in pending:
+            task.remove_done_callback(done.put_nowait)
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def wait_n_stream(n: int, max_delay: int, limit: int = 100,
+                        timeout: Optional[float] = None
+                        ) -> AsyncIterator[float]:
+    """
+    Waits for n random delays, at most limit at a time, and yields each
+    delay as soon as it has elapsed.
+
+    Args:
+        n (int): The number of delays to wait for.
+        max_delay (int): The maximum delay time.
+        limit (int): The maximum number of delays waited for at once.
+        timeout (float): The maximum time of each delay, in seconds.
+
+    Yields:
+        float: The delays, in completion order.
+    """
+    delays = (wait_random(max_delay) for _ in range(n))
+    stream = as_completed_bounded(delays, limit, timeout)
+    try:
+        async for delay in stream:
+            yield delay
+    finally:
+        await stream.aclose()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+"""
+This module contains variants of wait_n and task_wait_n that keep the
+delays ordered as they complete instead of sorting them at the end.
+
+Functions:
+    - insort_as_completed(aws, k, limit) -> AsyncIterator[List[float]]:
+    An asynchronous iterator over the sorted prefix of the results.
+    - wait_n_ordered(n, max_delay, k, limit) -> List[float]:
+    An ordered wait_n, optionally keeping only the k smallest delays.
+    - task_wait_n_ordered(n, max_delay, k) -> List[float]:
+    An ordered task_wait_n, optionally keeping only the k smallest delays.
+    - benchmark(n, max_delay, k) -> Dict[str, float]:
+    Times the ordered variants against wait_n.
+"""
+
+import asyncio
+import sys
+import time
+from bisect import insort
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+wait_random = __import__('0-basic_async_syntax').wait_random
+wait_n = __import__('1-concurrent_coroutines').wait_n
+task_wait_random = __import__('3-tasks').task_wait_random
+as_completed_bounded = __import__('5-bounded_concurrency').as_completed_bounded
+
+
+async def insort_as_completed(aws: Iterable[Awaitable[float]],
+                              k: Optional[int] = None,
+                              limit: Optional[int] = None
+                              ) -> AsyncIterator[List[float]]:
+    """
+    Inserts the result of each awaitable into a sorted list as soon as
+    it completes, and yields that list after every insertion.
+
+    A delay completes after sleeping for its own value, so results mostly
+    arrive in increasing order and each insertion lands at or near the
+    end of the list. With k, values larger than the k smallest seen so
+    far are dropped at once and the list never grows past k.
+
+    Args:
+        aws (Iterable[Awaitable[float]]): The awaitables to run.
+        k (int): The number of smallest results to keep, all if None.
+        limit (int): The maximum number of awaitables in flight,
+            unbounded if None.
+
+    Yields:
+        List[float]: The same list, sorted, after each insertion; copy it
+            to keep a snapshot.
+    """
+    if k is not None and k < 1:
+        raise ValueError("k must be at least 1")
+    aws = list(aws) if limit is None else aws
+    ordered: List[float] = []
+    stream = as_completed_bounded(
+        aws, limit if limit is not None else max(len(aws), 1))
+    try:
+        async for value in stream:
+            if k is not None and len(ordered) == k:
+                if value >= ordered[-1]:
+                    continue
+                ordered.pop()
+            insort(ordered, value)
+            yield ordered
+    finally:
+        await stream.aclose()
+
+
+async def wait_n_ordered(n: int, max_delay: int, k: Optional[int] = None,
+                         limit: Optional[int] = None) -> List[float]:
+    """
+    Asynchronously waits for a given number of random delays and returns
+    the sorted list of the delays, built as they complete.
+
+    Args:
+        n (int): The number of delays to wait for.
+        max_delay (int): The maximum delay time.
+        k (int): The number of smallest delays to return, all if None.
+        limit (int): The maximum number of delays waited for at once.
+
+    Returns:
+        List[float]: A sorted list of the (k smallest) delays.
+    """
+    ordered: List[float] = []
+    async for ordered in insort_as_completed(
+            (wait_random(max_delay) for _ in range(n)), k, limit):
+        pass
+    return ordered
+
+
+async def task_wait_n_ordered(n: int, max_delay: int,
+                              k: Optional[int] = None) -> List[float]:
+    """
+    Asynchronously waits for a given number of task_wait_random tasks and
+    returns the sorted list of the delays, built as they complete.
+
+    Args:
+        n (int): The number of delays to wait for.
+        max_delay (int): The maximum delay time.
+        k (int): The number of smallest delays to return, all if None.
+
+    Returns:
+        List[float]: A sorted list of the (k smallest) delays.
+    """
+    ordered: List[float] = []
+    async for ordered in insort_as_completed(
+            [task_wait_random(max_delay) for _ in range(n)], k):
+        pass
+    return ordered
+
+
+def benchmark(n: int = 100000, max_delay: float = 0.01,
+              k: int = 10) -> Dict[str, float]:
+    """
+    Times wait_n against the ordered variants for the same n.
+
+    Args:
+        n (int): The number of delays to wait for.
+        max_delay (float): The maximum delay time, small so that the
+            bookkeeping rather than the sleeping dominates.
+        k (int): The number of smallest delays of the top-k run.
+
+    Returns:
+        Dict[str, float]: The runtime of each variant, in seconds.
+    """
+    runs = {
+        "heapify": lambda: wait_n(n, max_delay),
+        "ordered": lambda: wait_n_ordered(n, max_delay),
+        "top_{}".format(k): lambda: wait_n_ordered(n, max_delay, k),
+    }
+    timings: Dict[str, float] = {}
+    for name, run in runs.items():
+        started_at = time.perf_counter()
+        asyncio.run(run())
+        timings[name] = time.perf_counter() - started_at
+    return timings
+
+
+if __name__ == "__main__":
+    for name, seconds in benchmark(*map(int, sys.argv[1:2])).items():
+        print("{:>10} {:.3f}s".format(name, seconds))
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+
+"""
+This module contains a benchmark runner for coroutines, the multi-run
+counterpart of measure_time.
+
+Functions:
+    - benchmark(factory, runs, warmup) -> Dict[str, Any]:
+    Runs the coroutines made by factory and summarizes their runtimes.
+    - load(target) -> Callable:
+    Loads a function given as 'path/to/module.py:name'.
+
+Usage:
+    ./7-benchmark.py --runs 20 1-concurrent_coroutines.py:wait_n 100 1
+    ./7-benchmark.py --output runtime.json \\
+        ../0x02-python_async_comprehension/2-measure_runtime.py:measure_runtime
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import math
+import os
+import selectors
+import statistics
+import sys
+import time
+from ast import literal_eval
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Sequence,
+)
+
+
+class _TimedSelector(selectors.DefaultSelector):
+    """
+    Selector adding up the time the event loop spends waiting in select,
+    that is sleeping or waiting for I/O rather than running callbacks.
+    """
+
+    idle_ns = 0
+
+    def select(self, timeout=None):
+        """Waits like the default selector, timing the wait."""
+        started_at = time.perf_counter_ns()
+        try:
+            return super().select(timeout)
+        finally:
+            self.idle_ns += time.perf_counter_ns() - started_at
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Returns the q-th percentile of values, by the nearest-rank method.
+
+    Args:
+        values (Sequence[float]): The values, in any order.
+        q (float): The percentile, between 0 and 100.
+
+    Returns:
+        float: The smallest value greater or equal to q% of the values.
+    """
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def _summary(values_ns: Sequence[int]) -> Dict[str, float]:
+    """Min, mean, p50, p99 and standard deviation, in seconds."""
+    values = [value / 1e9 for value in values_ns]
+    return {
+        "min": min(values),
+        "mean": statistics.mean(values),
+        "p50": percentile(values, 50),
+        "p99": percentile(values, 99),
+        "stddev": statistics.stdev(values) if len(values) > 1 else 0.0,
+    }
+
+
+def benchmark(factory: Callable[[], Awaitable[Any]], runs: int = 10,
+              warmup: int = 1) -> Dict[str, Any]:
+    """
+    Runs the coroutines made by factory one after the other on a single
+    event loop, and summarizes their runtimes.
+
+    Each runtime is split between the time the loop spent idle, waiting
+    in select for timers and I/O, and the time it spent busy running
+    callbacks, which is the event-loop and CPU overhead.
+
+    Args:
+        factory (Callable[[], Awaitable]): A function returning a new
+            coroutine for each run, e.g. lambda: wait_n(10, 1).
+        runs (int): The number of measured runs.
+        warmup (int): The number of runs made and discarded first.
+
+    Returns:
+        Dict[str, Any]: The runs made and the min, mean, p50, p99 and
+            stddev, in seconds, of the total, idle and busy times.
+    """
+    if runs < 1:
+        raise ValueError("runs must be at least 1")
+    selector = _TimedSelector()
+    loop = asyncio.SelectorEventLoop(selector)
+    totals: List[int] = []
+    idles: List[int] = []
+    try:
+        for run in range(warmup + runs):
+            idle_ns = selector.idle_ns
+            started_at = time.perf_counter_ns()
+            loop.run_until_complete(factory())
+            ended_at = time.perf_counter_ns()
+            if run >= warmup:
+                totals.append(ended_at - started_at)
+                idles.append(selector.idle_ns - idle_ns)
+        loop.run_until_complete(loop.shutdown_asyncgens())
+    finally:
+        loop.close()
+    return {
+        "runs": runs,
+        "warmup": warmup,
+        "total": _summary(totals),
+        "idle": _summary(idles),
+        "busy": _summary([total - idle
+                          for total, idle in zip(totals, idles)]),
+    }
+
+
+def load(target: str) -> Callable[..., Any]:
+    """
+    Loads a function given as 'path/to/module.py:name'; the directory of
+    the module is added to sys.path so that its own imports resolve.
+
+    Args:
+        target (str): The module path and function name.
+
+    Returns:
+        Callable: The function.
+    """
+    path, _, name = target.rpartition(":")
+    directory = os.path.dirname(os.path.abspath(path))
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    spec = importlib.util.spec_from_file_location(
+        os.path.splitext(os.path.basename(path))[0], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, name)
+
+
+def main(argv: Sequence[str] = None) -> None:
+    """
+    Benchmarks the coroutine function named on the command line, called
+    with the given arguments, and prints the summary as JSON.
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("target", nargs="?", default=None,
+                        help="coroutine function, as module.py:name; "
+                        "wait_n(10, 1) by default")
+    parser.add_argument("args", nargs="*",
+                        help="arguments of the coroutine function")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--output", help="also write the JSON to a file")
+    options = parser.parse_args(argv)
+
+    if options.target is None:
+        options.target = os.path.join(os.path.dirname(__file__),
+                                      "1-concurrent_coroutines.py:wait_n")
+        options.args = options.args or ["10", "1"]
+    function = load(options.target)
+    args = [literal_eval(arg) for arg in options.args]
+    result = benchmark(lambda: function(*args), options.runs, options.warmup)
+    result["target"] = options.target
+    result["args"] = args
+    document = json.dumps(result, indent=2)
+    print(document)
+    if options.output:
+        with open(options.output, "w") as output:
+            output.write(document + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+
+"""
+This module contains an event loop running on a virtual clock, which
+jumps straight to the next timer instead of sleeping until it is due.
+
+Coroutines such as wait_random, wait_n or async_generator then complete
+in the time it takes to run their callbacks, while timers still fire in
+the order of their deadlines. While work runs outside the loop, jobs of
+run_in_executor or sockets registered with the loop, the clock follows
+real time instead, so that a timeout does not expire before a job that
+would have finished in time.
+
+Classes:
+    - VirtualClockLoop: A selector event loop with a virtual clock.
+    - VirtualClockPolicy: An event loop policy making VirtualClockLoops.
+
+Functions:
+    - run_virtual(main, seed) -> Any:
+    Like asyncio.run, on a virtual clock and with seeded randomness.
+    - time_virtual(main, seed) -> Tuple[Any, float]:
+    Like run_virtual, also returning the virtual time main took.
+
+measure_time and measure_runtime time themselves with time.time(), so on
+a virtual clock they return the wall time of the simulation, not the
+simulated runtime; use time_virtual to get the latter.
+"""
+
+import asyncio
+import random
+import selectors
+import time
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    """
+    Selector polling for I/O without blocking, then advancing the clock
+    of its loop by the time the loop would have waited, unless work is
+    pending outside the loop.
+    """
+
+    def __init__(self) -> None:
+        """Initializes the selector with a clock at zero."""
+        super().__init__()
+        self.now = 0.0
+        self.jobs = 0
+        self.baseline = 0
+
+    def busy(self) -> bool:
+        """
+        Tells whether an executor job is running or file objects other
+        than the self-pipe of the loop are registered.
+
+        Returns:
+            bool: True if something outside the loop may still complete.
+        """
+        return self.jobs > 0 or len(self.get_map()) > self.baseline
+
+    def select(self, timeout=None):
+        """
+        Returns the ready events, advancing the clock if there are none.
+        A None timeout means no timer is pending, so the loop really
+        blocks until I/O or a call from another thread wakes it up; so
+        does it while busy, and the clock then moves by the real time
+        waited.
+        """
+        if timeout is None or self.busy():
+            started_at = time.monotonic()
+            events = super().select(timeout)
+            waited = time.monotonic() - started_at
+            self.now += waited if timeout is None else min(waited, timeout)
+            return events
+        events = super().select(0)
+        if not events and timeout > 0:
+            self.now += timeout
+        return events
+
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    """
+    Selector event loop whose time() is a virtual clock starting at zero,
+    jumping ahead only when every task is waiting on a timer and nothing
+    runs in an executor or waits on a socket; it follows real time
+    otherwise.
+    """
+
+    def __init__(self) -> None:
+        """Initializes the loop with a virtual selector."""
+        self._virtual_selector = _VirtualSelector()
+        super().__init__(self._virtual_selector)
+        # the self-pipe is registered by now, and never completes work
+        self._virtual_selector.baseline = len(
+            self._virtual_selector.get_map())
+
+    def time(self) -> float:
+        """
+        Returns the virtual time of the loop.
+
+        Returns:
+            float: The seconds elapsed on the virtual clock.
+        """
+        return self._virtual_selector.now
+
+    def run_in_executor(self, executor: Optional[Executor],
+                        func: Callable[..., Any],
+                        *args: Any) -> asyncio.Future:
+        """
+        Runs func in executor like the default loop, keeping the clock
+        on real time until it is done.
+
+        Args:
+            executor (Executor): The executor, the default one if None.
+            func (Callable): The function to run.
+            args (Any): The arguments of func.
+
+        Returns:
+            asyncio.Future: The future of the result of func.
+        """
+        future = super().run_in_executor(executor, func, *args)
+        self._virtual_selector.jobs += 1
+        future.add_done_callback(self._job_done)
+        return future
+
+    def _job_done(self, future: asyncio.Future) -> None:
+        """Counts an executor job as done."""
+        self._virtual_selector.jobs -= 1
+
+
+class VirtualClockPolicy(asyncio.DefaultEventLoopPolicy):
+    """
+    Event loop policy making VirtualClockLoops, so that code calling
+    asyncio.run runs on a virtual clock. Code timing itself with
+    time.time() or time.perf_counter(), such as measure_time, then
+    measures how long the simulation took, not the virtual time.
+    """
+
+    def new_event_loop(self) -> VirtualClockLoop:
+        """
+        Creates a new virtual clock event loop.
+
+        Returns:
+            VirtualClockLoop: The new event loop.
+        """
+        return VirtualClockLoop()
+
+
+def run_virtual(main: Awaitable[Any], seed: Optional[int] = None) -> Any:
+    """
+    Runs main like asyncio.run, on a virtual clock.
+
+    The random module is seeded first, so the delays drawn by wait_random
+    and the values of async_generator are the same on every run with the
+    same seed. Inside main, asyncio.get_running_loop().time() gives the
+    virtual time elapsed.
+
+    Args:
+        main (Awaitable): The coroutine to run.
+        seed (int): The seed of the random module, left alone if None.
+
+    Returns:
+        Any: The result of main.
+    """
+    if seed is not None:
+        random.seed(seed)
+    policy = asyncio.get_event_loop_policy()
+    asyncio.set_event_loop_policy(VirtualClockPolicy())
+    try:
+        return asyncio.run(main)
+    finally:
+        asyncio.set_event_loop_policy(policy)
+
+
+def time_virtual(main: Awaitable[Any], seed: Optional[int] = None
+                 ) -> Tuple[Any, float]:
+    """
+    Runs main like run_virtual, and measures it on the virtual clock.
+
+    This is the virtual counterpart of measure_time: time_virtual(
+    wait_n(n, max_delay))[1] / n is what measure_time(n, max_delay)
+    returns on a real clock.
+
+    Args:
+        main (Awaitable): The coroutine to run.
+        seed (int): The seed of the random module, left alone if None.
+
+    Returns:
+        Tuple[Any, float]: The result of main and the virtual seconds it
+            took.
+    """
+    async def timed() -> Tuple[Any, float]:
+        """Awaits main between two readings of the virtual clock."""
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        result = await main
+        return result, loop.time() - started_at
+
+    return run_virtual(timed(), seed)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+"""
+This module contains unit tests for the virtual-clock event loop
+in the '8-virtual_clock' module.
+"""
+
+import asyncio
+import time
+import unittest
+virtual_clock = __import__('8-virtual_clock')
+wait_n = __import__('1-concurrent_coroutines').wait_n
+
+
+class TestVirtualClock(unittest.TestCase):
+    """
+    Test case for the VirtualClockLoop and its helpers.
+    """
+
+    def test_timer_order(self) -> None:
+        """
+        Test that timers fire in deadline order without real sleeping.
+
+        Returns:
+            None
+        """
+        order = []
+
+        async def sleeper(delay: float) -> None:
+            """Sleeps, then records its delay."""
+            await asyncio.sleep(delay)
+            order.append(delay)
+
+        async def sleepers() -> None:
+            """Starts the sleepers in reverse order of their delays."""
+            await asyncio.gather(*(sleeper(delay) for delay in (30, 10, 20)))
+
+        started_at = time.monotonic()
+        _, elapsed = virtual_clock.time_virtual(sleepers())
+
+        self.assertEqual(order, [10, 20, 30])
+        self.assertEqual(elapsed, 30)
+        self.assertLess(time.monotonic() - started_at, 1)
+
+    def test_executor_job_not_timed_out(self) -> None:
+        """
+        Test that the clock follows real time while an executor job runs,
+        so that a timeout longer than the job does not expire.
+
+        Returns:
+            None
+        """
+        async def job() -> None:
+            """Waits for a short executor job with a long timeout."""
+            loop = asyncio.get_running_loop()
+            return await asyncio.wait_for(
+                loop.run_in_executor(None, time.sleep, 0.05), 5)
+
+        result, elapsed = virtual_clock.time_virtual(job())
+
+        self.assertIsNone(result)
+        self.assertLess(elapsed, 5)
+
+    def test_seeded(self) -> None:
+        """
+        Test that a seed makes the delays of wait_n reproducible.
+
+        Returns:
+            None
+        """
+        first = virtual_clock.time_virtual(wait_n(5, 10), seed=1)
+        second = virtual_clock.time_virtual(wait_n(5, 10), seed=1)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first[1], max(first[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+"""
+This module contains a configurable counterpart of async_generator that
+yields random values in array('d') chunks, and a bounded buffer putting
+backpressure between such a producer and its consumer.
+
+Functions:
+    - async_producer(count, interval, jitter, batch_size):
+    An asynchronous generator of chunks of random values.
+    - buffered(chunks, maxsize):
+    An asynchronous iterator reading ahead of its consumer through a
+    bounded queue.
+    - collect(chunks) -> array:
+    Concatenates the chunks into a single array.
+"""
+
+import asyncio
+import random
+from array import array
+from typing import AsyncIterable, AsyncIterator
+
+
+async def async_producer(count: int = 10, interval: float = 1.0,
+                         jitter: float = 0.0, batch_size: int = 1
+                         ) -> AsyncIterator[array]:
+    """
+    Asynchronous generator that yields count random values between 0
+    and 10, batch_size at a time.
+
+    The producer waits interval seconds per value, once per chunk, so
+    the rate is the same whatever the batch size while the number of
+    awaits, and of objects handed to the consumer, drops batch_size
+    fold. Defaults match async_generator, one value per second.
+
+    Args:
+        count (int): The number of values to yield.
+        interval (float): The seconds waited per value.
+        jitter (float): The maximum random deviation, in seconds, of
+            each wait.
+        batch_size (int): The maximum number of values per chunk.
+
+    Yields:
+        array: An array('d') of at most batch_size values.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        delay = interval * size
+        if jitter:
+            delay = max(delay + random.uniform(-jitter, jitter), 0.0)
+        await asyncio.sleep(delay)
+        yield array('d', [random.random() * 10 for _ in range(size)])
+
+
+async def buffered(chunks: AsyncIterable[array],
+                   maxsize: int = 16) -> AsyncIterator[array]:
+    """
+    Reads chunks ahead of the consumer, in a task of its own, through a
+    queue of at most maxsize chunks. A fast producer is suspended once
+    the queue is full, and a slow one no longer stalls the consumer
+    between chunks it has already produced. Closing the iterator, with
+    aclose, cancels the producer.
+
+    Args:
+        chunks (AsyncIterable[array]): The producer.
+        maxsize (int): The maximum number of chunks read ahead.
+
+    Yields:
+        array: The chunks of the producer, in order.
+    """
+    if maxsize < 1:
+        raise ValueError("maxsize must be at least 1")
+    queue: asyncio.Queue = asyncio.Queue(maxsize)
+    done = object()
+
+    async def produce() -> None:
+        """Puts every chunk in the queue, then the end marker or error."""
+        try:
+            async for chunk in chunks:
+                await queue.put(chunk)
+        except Exception as error:
+            await queue.put(error)
+        else:
+            await queue.put(done)
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        while True:
+            chunk = await queue.get()
+            if chunk is done:
+                break
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+
+
+async def collect(chunks: AsyncIterable[array]) -> array:
+    """
+    Concatenates the chunks of a producer into a single array.
+
+    Args:
+        chunks (AsyncIterable[array]): The producer.
+
+    Returns:
+        array: An array('d') of every value produced.
+    """
+    values = array('d')
+    async for chunk in chunks:
+        values.extend(chunk)
+    return values
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+"""
+This module contains a fan-in of several asynchronous generators into
+one asynchronous stream, and an async_comprehension collecting from it.
+
+Functions:
+    - merge(*sources, key, maxsize):
+    An asynchronous iterator over the items of every source, consumed
+    concurrently.
+    - async_comprehension_merged(n, maxsize) -> List[float]:
+    Collects the values of n async_generators consumed concurrently.
+"""
+
+import asyncio
+import heapq
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    List,
+    Optional,
+)
+async_generator = __import__('0-async_generator').async_generator
+
+_DONE = object()
+
+
+async def _pump(source: AsyncIterable[Any], queue: asyncio.Queue,
+                index: int) -> None:
+    """
+    Puts the items of source in queue as (index, item) pairs, then the
+    end marker, or the error that stopped the source.
+    """
+    try:
+        async for item in source:
+            await queue.put((index, item))
+    except Exception as error:
+        await queue.put((index, error))
+    else:
+        await queue.put((index, _DONE))
+
+
+async def merge(*sources: AsyncIterable[Any],
+                key: Optional[Callable[[Any], Any]] = None,
+                maxsize: int = 0) -> AsyncIterator[Any]:
+    """
+    Consumes every source concurrently, each in a task of its own, and
+    yields their items as one stream, so draining it takes as long as
+    the slowest source rather than the sum of them.
+
+    Without key, items are yielded as they arrive. With key, sources
+    are expected to be sorted by it and items are yielded sorted by it,
+    each as soon as every unfinished source has an item to compare it
+    with. Closing the iterator, with aclose, cancels the sources.
+
+    Args:
+        sources (AsyncIterable): The asynchronous generators to merge.
+        key (Callable): The ordering key of the items, arrival order if
+            None.
+        maxsize (int): The maximum number of items read ahead, shared by
+            all sources without key and per source with it; unbounded
+            if 0.
+
+    Yields:
+        Any: The items of every source.
+    """
+    if key is None:
+        queues = [asyncio.Queue(maxsize)] * len(sources)
+    else:
+        queues = [asyncio.Queue(maxsize) for _ in sources]
+    tasks = [asyncio.ensure_future(_pump(source, queue, index))
+             for index, (source, queue) in enumerate(zip(sources, queues))]
+
+    def unwrap(item: Any) -> Any:
+        """Raises the error of a failed source, returns any other item."""
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    try:
+        if key is None:
+            running = len(sources)
+            while running:
+                _, item = await queues[0].get()
+                if item is _DONE:
+                    running -= 1
+                else:
+                    yield unwrap(item)
+            return
+
+        # heap of the next item of each unfinished source; the index
+        # breaks ties, so the items themselves are never compared
+        heads: List[Any] = []
+        for queue in queues:
+            index, item = await queue.get()
+            if item is not _DONE:
+                item = unwrap(item)
+                heads.append((key(item), index, item))
+        heapq.heapify(heads)
+        while heads:
+            _, index, item = heads[0]
+            yield item
+            _, following = await queues[index].get()
+            if following is _DONE:
+                heapq.heappop(heads)
+            else:
+                following = unwrap(following)
+                heapq.heapreplace(heads, (key(following), index, following))
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def async_comprehension_merged(n: int = 4,
+                                     maxsize: int = 0) -> List[float]:
+    """
+    Generate a list of random floats using async comprehension over n
+    async_generators merged together; it takes as long as one of them.
+
+    The values are in arrival order: async_generator yields them in no
+    particular order, so merge's key ordering does not apply.
+
+    Args:
+        n (int): The number of async_generators to merge.
+        maxsize (int): The maximum number of values read ahead.
+
+    Returns:
+        A list of random floats.
+    """
+    sources = [async_generator() for _ in range(n)]
+    return [flt async for flt in merge(*sources, maxsize=maxsize)]
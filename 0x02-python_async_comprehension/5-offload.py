@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+
+"""
+This module contains helpers shipping CPU-bound work of an asynchronous
+pipeline to an executor, chunk by chunk, so that the event loop keeps
+running while it is done.
+
+Functions:
+    - offload_chunks(func, chunks, executor, max_pending):
+    An asynchronous iterator over func(chunk) for each chunk, in order.
+    - offload_map(func, items, chunksize, executor, max_pending):
+    An asynchronous iterator over func(item) for each item, in order.
+    - benchmark(workers, chunks, chunksize) -> Dict[str, float]:
+    Times offload_chunks on process pools of growing sizes.
+
+Usage:
+    ./5-offload.py 1 2 4 8
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
+
+
+async def _aiter(items: Union[Iterable[Any], AsyncIterable[Any]]
+                 ) -> AsyncIterator[Any]:
+    """Iterates asynchronously over a synchronous or asynchronous iterable."""
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def offload_chunks(func: Callable[[Any], Any],
+                         chunks: Union[Iterable[Any], AsyncIterable[Any]],
+                         executor: Optional[Executor] = None,
+                         max_pending: Optional[int] = None
+                         ) -> AsyncIterator[Any]:
+    """
+    Runs func on each chunk in executor and yields the results in the
+    order of the chunks, while up to max_pending chunks are in flight.
+
+    Use a ProcessPoolExecutor for pure Python work, which holds the GIL;
+    func and the chunks must then be picklable, e.g. a module-level
+    function and lists or arrays. A thread pool, the loop default when
+    executor is None, suits work releasing the GIL.
+
+    Args:
+        func (Callable): The function applied to each chunk.
+        chunks (Iterable or AsyncIterable): The chunks, e.g. the arrays
+            of async_producer.
+        executor (Executor): The executor running func, the default
+            thread pool of the loop if None.
+        max_pending (int): The maximum number of chunks in flight, twice
+            the number of CPUs if None.
+
+    Yields:
+        Any: func(chunk) for each chunk, in order.
+    """
+    if max_pending is None:
+        max_pending = 2 * (os.cpu_count() or 1)
+    if max_pending < 1:
+        raise ValueError("max_pending must be at least 1")
+    loop = asyncio.get_running_loop()
+    pending: Deque[asyncio.Future] = deque()
+    try:
+        async for chunk in _aiter(chunks):
+            pending.append(loop.run_in_executor(executor, func, chunk))
+            if len(pending) >= max_pending:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _map_chunk(func: Callable[[Any], Any], chunk: Sequence[Any]
+               ) -> List[Any]:
+    """Applies func to every item of chunk."""
+    return [func(item) for item in chunk]
+
+
+async def _chunked(items: Union[Iterable[Any], AsyncIterable[Any]],
+                   chunksize: int) -> AsyncIterator[List[Any]]:
+    """Groups items in lists of chunksize, the last one possibly shorter."""
+    if not hasattr(items, "__aiter__"):
+        iterator = iter(items)
+        chunk = list(islice(iterator, chunksize))
+        while chunk:
+            yield chunk
+            chunk = list(islice(iterator, chunksize))
+        return
+    chunk = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def offload_map(func: Callable[[Any], Any],
+                      items: Union[Iterable[Any], AsyncIterable[Any]],
+                      chunksize: int = 1024,
+                      executor: Optional[Executor] = None,
+                      max_pending: Optional[int] = None
+                      ) -> AsyncIterator[Any]:
+    """
+    Runs func on every item in executor, chunksize items per call, and
+    yields the results in the order of the items.
+
+    Args:
+        func (Callable): The function applied to each item.
+        items (Iterable or AsyncIterable): The items, e.g. the delays of
+            wait_n or the values of async_generator.
+        chunksize (int): The number of items shipped per call.
+        executor (Executor): The executor running func, the default
+            thread pool of the loop if None.
+        max_pending (int): The maximum number of chunks in flight.
+
+    Yields:
+        Any: func(item) for each item, in order.
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    results = offload_chunks(partial(_map_chunk, func),
+                             _chunked(items, chunksize), executor,
+                             max_pending)
+    async for chunk in results:
+        for result in chunk:
+            yield result
+
+
+def _sort_chunk(chunk: Sequence[float]) -> float:
+    """Sorts chunk by insertion in pure Python, returns its median."""
+    ordered = list(chunk)
+    for index in range(1, len(ordered)):
+        value = ordered[index]
+        position = index
+        while position and ordered[position - 1] > value:
+            ordered[position] = ordered[position - 1]
+            position -= 1
+        ordered[position] = value
+    return ordered[len(ordered) // 2]
+
+
+def benchmark(workers: Sequence[int] = (1, 2, 4), chunks: int = 64,
+              chunksize: int = 1000) -> Dict[str, float]:
+    """
+    Times the processing of chunks of random values, first inline, then
+    through offload_chunks on process pools of each size in workers.
+
+    Args:
+        workers (Sequence[int]): The process pool sizes to time.
+        chunks (int): The number of chunks processed.
+        chunksize (int): The number of values per chunk.
+
+    Returns:
+        Dict[str, float]: The runtime of each configuration, in seconds.
+    """
+    data = [[random.random() * 10 for _ in range(chunksize)]
+            for _ in range(chunks)]
+
+    async def drain(executor: Optional[Executor]) -> None:
+        """Processes every chunk through offload_chunks."""
+        async for _ in offload_chunks(_sort_chunk, data, executor):
+            pass
+
+    started_at = time.perf_counter()
+    for chunk in data:
+        _sort_chunk(chunk)
+    timings = {"inline": time.perf_counter() - started_at}
+    for count in workers:
+        with ProcessPoolExecutor(max_workers=count) as executor:
+            # start the workers before timing
+            list(executor.map(abs, range(count)))
+            started_at = time.perf_counter()
+            asyncio.run(drain(executor))
+            timings["processes={}".format(count)] = \
+                time.perf_counter() - started_at
+    return timings
+
+
+if __name__ == "__main__":
+    results = benchmark([int(arg) for arg in sys.argv[1:]] or (1, 2, 4))
+    for name, seconds in results.items():
+        print("{:>13} {:.3f}s {:.2f}x".format(
+            name, seconds, results["inline"] / seconds))
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""Benchmarks of the github org client and its utilities.
+
+Usage: ./benchmarks.py memoize [--readers 32] [--latency 0.05]
+       ./benchmarks.py accessor [--records 100000]
+       ./benchmarks.py client [--orgs 20] [--repos 300] [--latency 0.01]
+                              [--output results.json]
+                              [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import json
+import math
+import re
+import threading
+import time
+import timeit
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from functools import wraps
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+)
+from urllib.parse import parse_qs, urlsplit
+
+from client import AsyncGithubOrgClient, GithubOrgClient
+from transport import HTTPTransport
+from utils import access_nested_map, compile_path, memoize
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """q-th percentile (0 <= q <= 100) of values, nearest rank"""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def property_memoize(fn: Callable) -> property:
+    """Baseline: the original property-based memoize, without ttl, LRU,
+    locking or metrics"""
+    attr_name = "_{}".format(fn.__name__)
+
+    @wraps(fn)
+    def memoized(self):
+        """memoized wraps"""
+        if not hasattr(self, attr_name):
+            setattr(self, attr_name, fn(self))
+        return getattr(self, attr_name)
+
+    return property(memoized)
+
+
+def bench_memoize(readers: int = 32, latency: float = 0.05,
+                  threadsafe: bool = True, reads: int = 100000,
+                  baseline: bool = False) -> Dict[str, Any]:
+    """Read a fresh memoized property from `readers` threads at once.
+    The property sleeps `latency` seconds, like a `get_json` call. Reports
+    how many times it ran, the latency seen by the readers, and the cost
+    of a read once the value is memoized. With `baseline`, the property
+    uses `property_memoize` and `threadsafe` is ignored.
+    """
+    decorator = property_memoize if baseline else memoize(
+        threadsafe=threadsafe)
+
+    class Client:
+        """Client whose property simulates a slow request"""
+        calls = 0
+
+        @decorator
+        def org(self) -> Dict:
+            """Count the call and wait like a network request"""
+            Client.calls += 1
+            time.sleep(latency)
+            return {"login": "bench"}
+
+    client = Client()
+    barrier = threading.Barrier(readers)
+    latencies: List[float] = []
+
+    def read() -> None:
+        """Wait for every reader, then read org"""
+        barrier.wait()
+        started_at = time.perf_counter()
+        client.org
+        latencies.append(time.perf_counter() - started_at)
+
+    threads = [threading.Thread(target=read) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    started_at = time.perf_counter()
+    for _ in range(reads):
+        client.org
+    cached_read = (time.perf_counter() - started_at) / reads
+
+    return {
+        "readers": readers,
+        "memoize": "property" if baseline else "memoize",
+        "threadsafe": threadsafe and not baseline,
+        "requests": Client.calls,
+        "latency_p50_ms": percentile(latencies, 50) * 1e3,
+        "latency_max_ms": max(latencies) * 1e3,
+        "cached_read_ns": cached_read * 1e9,
+    }
+
+
+def bench_accessor(records: int = 100000,
+                   repeat: int = 5) -> Dict[str, Any]:
+    """Read ``("license", "key")`` from `records` repos, the way
+    `GithubOrgClient.has_license` does, with `access_nested_map` and with
+    a compiled accessor. Reports the best of `repeat` runs in ns per
+    record.
+    """
+    repos = [{"name": "repo{}".format(i),
+              "license": {"key": "mit"} if i % 4 else None}
+             for i in range(records)]
+    path = ("license", "key")
+    license_key = compile_path(path, default=None)
+
+    def with_access_nested_map() -> None:
+        """Baseline: access_nested_map, KeyError on unlicensed repos"""
+        for repo in repos:
+            try:
+                access_nested_map(repo, path)
+            except KeyError:
+                pass
+
+    def with_accessor() -> None:
+        """Compiled accessor called on each repo"""
+        for repo in repos:
+            license_key(repo)
+
+    def with_extract() -> None:
+        """Compiled accessor over the whole batch"""
+        license_key.extract(repos)
+
+    results: Dict[str, Any] = {"records": records}
+    for name, fn in (("access_nested_map", with_access_nested_map),
+                     ("accessor", with_accessor),
+                     ("extract", with_extract)):
+        best = min(timeit.repeat(fn, number=1, repeat=repeat))
+        results["{}_ns".format(name)] = best / records * 1e9
+    return results
+
+
+class StubGithubServer(ThreadingHTTPServer):
+    """Local HTTP server answering like the GitHub orgs API.
+    Every org has `repos` repos shaped like ``fixtures.TEST_PAYLOAD`` ones,
+    padded to about `repo_bytes` bytes each, served `per_page` at a time
+    with ``Link`` pagination. Each request waits `latency` seconds.
+    Example
+    -------
+    >>> with StubGithubServer(repos=250) as server:
+    ...     transport = HTTPTransport(base_url=server.url)
+    ...     len(GithubOrgClient("google", transport).public_repos())
+    250
+    """
+    daemon_threads = True
+    LICENSES = ("apache-2.0", "mit", "bsd-3-clause", None)
+
+    def __init__(self, repos: int = 300, repo_bytes: int = 1000,
+                 latency: float = 0.0) -> None:
+        """Init method of StubGithubServer"""
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.repos = repos
+        self.repo_bytes = repo_bytes
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        daemon=True)
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server"""
+        return "http://127.0.0.1:{}".format(self.server_address[1])
+
+    def count_request(self) -> None:
+        """Count a served request"""
+        with self._lock:
+            self.requests += 1
+
+    def org_payload(self, org: str) -> Dict:
+        """Org document"""
+        return {"login": org,
+                "repos_url": "{}/orgs/{}/repos".format(self.url, org)}
+
+    def repos_page(self, org: str, page: int, per_page: int) -> List[Dict]:
+        """Repos of a page"""
+        first = (page - 1) * per_page
+        return [self.repo_payload(org, index) for index in
+                range(first, min(first + per_page, self.repos))]
+
+    def repo_payload(self, org: str, index: int) -> Dict:
+        """Repo document"""
+        license_key = self.LICENSES[index % len(self.LICENSES)]
+        return {"id": index, "name": "{}-repo{}".format(org, index),
+                "full_name": "{}/{}-repo{}".format(org, org, index),
+                "license": license_key and {"key": license_key},
+                "description": "x" * self.repo_bytes}
+
+    def __enter__(self) -> "StubGithubServer":
+        """Start serving in a background thread"""
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Stop serving"""
+        self.shutdown()
+        self.server_close()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Request handler of StubGithubServer"""
+    protocol_version = "HTTP/1.1"
+    ORG_PATH = re.compile(r"^/orgs/([^/]+)(/repos)?$")
+
+    def do_GET(self) -> None:
+        """Answer an org or repos page request"""
+        server: StubGithubServer = self.server
+        server.count_request()
+        time.sleep(server.latency)
+        parts = urlsplit(self.path)
+        match = self.ORG_PATH.match(parts.path)
+        if match is None:
+            self.send_error(404)
+            return
+        org, repos = match.groups()
+        headers = {"Content-Type": "application/json"}
+        if repos is None:
+            payload: Any = server.org_payload(org)
+        else:
+            query = parse_qs(parts.query)
+            page = int(query.get("page", ["1"])[0])
+            per_page = int(query.get("per_page", ["30"])[0])
+            payload = server.repos_page(org, page, per_page)
+            if page * per_page < server.repos:
+                headers["Link"] = '<{}/orgs/{}/repos?page={}&per_page={}>;' \
+                    ' rel="next"'.format(server.url, org, page + 1, per_page)
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Keep the benchmark output quiet"""
+
+
+def _run_mode(server: StubGithubServer, orgs: Sequence[str],
+              run: Callable[[HTTPTransport, List[float]], int]
+              ) -> Dict[str, Any]:
+    """Time run over orgs with a fresh transport, then run it again under
+    tracemalloc for the peak memory, so tracing does not slow the timed
+    pass. Requests are those the server answered in the timed pass."""
+    latencies: List[float] = []
+    requests_before = server.requests
+    with HTTPTransport(base_url=server.url, pool_maxsize=32) as transport:
+        started_at = time.perf_counter()
+        repos = run(transport, latencies)
+        elapsed = time.perf_counter() - started_at
+    requests = server.requests - requests_before
+    with HTTPTransport(base_url=server.url, pool_maxsize=32) as transport:
+        tracemalloc.start()
+        try:
+            run(transport, [])
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {
+        "orgs": len(orgs),
+        "repos": repos,
+        "requests": requests,
+        "seconds": elapsed,
+        "orgs_per_second": len(orgs) / elapsed,
+        "requests_per_second": requests / elapsed,
+        "org_latency_p50_ms": percentile(latencies, 50) * 1e3,
+        "org_latency_p99_ms": percentile(latencies, 99) * 1e3,
+        "peak_memory_kib": peak / 1024,
+    }
+
+
+def bench_client(orgs: int = 20, repos: int = 300, per_page: int = 100,
+                 repo_bytes: int = 1000, latency: float = 0.01,
+                 workers: int = 8) -> Dict[str, Dict[str, Any]]:
+    """Fetch the public repos of `orgs` orgs from a local stub server,
+    serially, over the `bulk_public_repos` thread pool, and with the
+    asyncio client, each mode with a fresh transport and clients.
+    """
+    org_names = ["org{}".format(i) for i in range(orgs)]
+
+    class TimedClient(GithubOrgClient):
+        """Client recording how long public_repos takes"""
+        PER_PAGE = per_page
+        latencies: List[float] = []
+
+        def public_repos(self, license: str = None) -> List[str]:
+            """Timed public_repos"""
+            started_at = time.perf_counter()
+            try:
+                return super().public_repos(license)
+            finally:
+                self.latencies.append(time.perf_counter() - started_at)
+
+    class TimedAsyncClient(AsyncGithubOrgClient):
+        """Async client recording how long public_repos takes"""
+        PER_PAGE = per_page
+        latencies: List[float] = []
+
+        async def public_repos(self, license: str = None) -> List[str]:
+            """Timed public_repos"""
+            started_at = time.perf_counter()
+            try:
+                return await super().public_repos(license)
+            finally:
+                self.latencies.append(time.perf_counter() - started_at)
+
+    def serial(transport: HTTPTransport, latencies: List[float]) -> int:
+        """One org after the other"""
+        TimedClient.latencies = latencies
+        return sum(len(TimedClient(org, transport).public_repos())
+                   for org in org_names)
+
+    def threaded(transport: HTTPTransport, latencies: List[float]) -> int:
+        """Orgs over the bulk_public_repos thread pool"""
+        TimedClient.latencies = latencies
+        return sum(len(result.repos) for result in
+                   TimedClient.bulk_public_repos(org_names,
+                                                 max_workers=workers,
+                                                 transport=transport))
+
+    def concurrent(transport: HTTPTransport,
+                   latencies: List[float]) -> int:
+        """Orgs with the asyncio client"""
+        TimedAsyncClient.latencies = latencies
+        results = asyncio.run(TimedAsyncClient.gather_public_repos(
+            org_names, max_concurrency=workers, transport=transport))
+        return sum(len(repos) for repos in results.values())
+
+    with StubGithubServer(repos, repo_bytes, latency) as server:
+        return {mode: _run_mode(server, org_names, run) for mode, run in
+                (("serial", serial), ("threaded", threaded),
+                 ("async", concurrent))}
+
+
+def compare(results: Dict[str, Dict[str, Any]],
+            baseline: Dict[str, Dict[str, Any]]) -> Dict[str, Dict]:
+    """Ratio of each numeric result to its baseline value"""
+    ratios: Dict[str, Dict] = {}
+    for mode, values in results.items():
+        for name, value in values.items():
+            base: Optional[float] = baseline.get(mode, {}).get(name)
+            if isinstance(value, (int, float)) and base:
+                ratios.setdefault(mode, {})[name] = value / base
+    return ratios
+
+
+def main() -> None:
+    """Run the benchmark named on the command line"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    memoize_parser = commands.add_parser(
+        "memoize", help="memoize under concurrent readers")
+    memoize_parser.add_argument("--readers", type=int, default=32)
+    memoize_parser.add_argument("--latency", type=float, default=0.05)
+
+    accessor_parser = commands.add_parser(
+        "accessor", help="compiled path accessor vs access_nested_map")
+    accessor_parser.add_argument("--records", type=int, default=100000)
+
+    client_parser = commands.add_parser(
+        "client", help="GithubOrgClient against a local stub server")
+    client_parser.add_argument("--orgs", type=int, default=20)
+    client_parser.add_argument("--repos", type=int, default=300)
+    client_parser.add_argument("--per-page", type=int, default=100)
+    client_parser.add_argument("--repo-bytes", type=int, default=1000)
+    client_parser.add_argument("--latency", type=float, default=0.01)
+    client_parser.add_argument("--workers", type=int, default=8)
+    client_parser.add_argument("--output", help="save results as JSON")
+    client_parser.add_argument("--compare",
+                               help="JSON results to compare against")
+
+    args = parser.parse_args()
+    if args.command == "memoize":
+        results = [bench_memoize(args.readers, args.latency,
+                                 threadsafe=False, baseline=True)]
+        results += [bench_memoize(args.readers, args.latency, threadsafe)
+                    for threadsafe in (False, True)]
+    elif args.command == "accessor":
+        results = [bench_accessor(args.records)]
+    elif args.command == "client":
+        results = bench_client(args.orgs, args.repos, args.per_page,
+                               args.repo_bytes, args.latency, args.workers)
+        if args.output:
+            with open(args.output, "w") as output:
+                json.dump(results, output, indent=2)
+        if args.compare:
+            with open(args.compare) as baseline:
+                results = {"results": results, "ratio_to_baseline":
+                           compare(results, json.load(baseline))}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
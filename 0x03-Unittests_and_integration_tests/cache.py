@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""HTTP response caches for conditional requests.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Dict,
+    NamedTuple,
+    Optional,
+)
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+__all__ = [
+    "CachedResponse",
+    "ResponseCache",
+    "SQLiteCache",
+]
+
+
+class CachedResponse(NamedTuple):
+    """A response body kept with the headers needed to revalidate it
+    """
+    url: str
+    headers: Dict[str, str]
+    content: bytes
+    stored_at: float
+
+    @classmethod
+    def from_response(cls, response: requests.Response) -> \
+            Optional["CachedResponse"]:
+        """Cache entry of a response, None if it is not a success"""
+        if response.status_code != 200:
+            return None
+        return cls(response.url, dict(response.headers), response.content,
+                   time.time())
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers revalidating this entry"""
+        headers = CaseInsensitiveDict(self.headers)
+        validators = {}
+        if headers.get("ETag"):
+            validators["If-None-Match"] = headers["ETag"]
+        if headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = headers["Last-Modified"]
+        return validators
+
+    def to_response(self) -> requests.Response:
+        """Rebuild a 200 response from the cached body and headers"""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = self.url
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.encoding = requests.utils.get_encoding_from_headers(
+            response.headers)
+        response._content = self.content
+        return response
+
+
+class ResponseCache:
+    """Thread-safe in-memory store of responses.
+    Without a `ttl`, only responses that can be revalidated are kept, and
+    they are always revalidated. With one, any successful response is
+    served without a request while younger than `ttl` seconds. The least
+    recently used entries are dropped past `maxsize`.
+    Example
+    -------
+    >>> transport = HTTPTransport(cache=ResponseCache(maxsize=256))
+    """
+
+    def __init__(self, maxsize: int = 1024,
+                 ttl: Optional[float] = None) -> None:
+        """Init method of ResponseCache"""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fresh(self, entry: CachedResponse) -> bool:
+        """Whether entry may be served without a request"""
+        return self.ttl is not None and \
+            time.time() - entry.stored_at < self.ttl
+
+    def accepts(self, entry: CachedResponse) -> bool:
+        """Whether entry is worth keeping"""
+        return self.ttl is not None or bool(entry.validators())
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Cached entry of key, if any"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        """Store entry under key, if it is worth keeping"""
+        if not self.accepts(entry):
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def record(self, hit: bool) -> None:
+        """Count a lookup, hit when the cached body was served"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        """Number of cached entries"""
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size"""
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self), "maxsize": self.maxsize}
+
+
+class SQLiteCache(ResponseCache):
+    """Response cache persisted in a SQLite database of a local directory,
+    so cold starts and cron jobs reuse the responses of earlier processes.
+    Every write is a single transaction and the database runs in WAL mode,
+    so several worker processes can share the directory. The oldest
+    entries are dropped once the bodies exceed `max_bytes`.
+    Parameters
+    ----------
+    directory: str
+        directory holding the database, created if needed
+    ttl: float
+        seconds during which a response is served without a request
+    max_bytes: int
+        total size of the cached bodies
+    Example
+    -------
+    >>> cache = SQLiteCache("~/.cache/github-org-client", ttl=600)
+    >>> set_transport(HTTPTransport(cache=cache))
+    """
+    FILENAME = "responses.sqlite3"
+
+    def __init__(self, directory: str, ttl: Optional[float] = None,
+                 max_bytes: int = 64 * 1024 * 1024,
+                 timeout: float = 30) -> None:
+        """Init method of SQLiteCache"""
+        super().__init__(maxsize=0, ttl=ttl)
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        directory = os.path.expanduser(directory)
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, self.FILENAME)
+        self._local = threading.local()
+        with self._connection as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, url TEXT NOT NULL,"
+                " headers TEXT NOT NULL, content BLOB NOT NULL,"
+                " stored_at REAL NOT NULL)")
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_stored_at"
+                " ON responses (stored_at)")
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        """Connection of the calling thread"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout,
+                                         isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Cached entry of key, if any"""
+        row = self._connection.execute(
+            "SELECT url, headers, content, stored_at FROM responses"
+            " WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        url, headers, content, stored_at = row
+        return CachedResponse(url, json.loads(headers), bytes(content),
+                              stored_at)
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        """Store entry under key, then evict past max_bytes"""
+        if not self.accepts(entry) or len(entry.content) > self.max_bytes:
+            return
+        connection = self._connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (key, url, headers, content, stored_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, entry.url, json.dumps(entry.headers), entry.content,
+                 entry.stored_at))
+            total, = connection.execute(
+                "SELECT COALESCE(SUM(LENGTH(content)), 0)"
+                " FROM responses").fetchone()
+            if total > self.max_bytes:
+                rows = connection.execute(
+                    "SELECT key, LENGTH(content) FROM responses"
+                    " ORDER BY stored_at").fetchall()
+                for old_key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    connection.execute(
+                        "DELETE FROM responses WHERE key = ?", (old_key,))
+                    total -= size
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters"""
+        self._connection.execute("DELETE FROM responses")
+        self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        """Number of cached entries"""
+        count, = self._connection.execute(
+            "SELECT COUNT(*) FROM responses").fetchone()
+        return count
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters, current size and bytes"""
+        size, total = self._connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(content)), 0)"
+            " FROM responses").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "size": size,
+                "bytes": total, "max_bytes": self.max_bytes}
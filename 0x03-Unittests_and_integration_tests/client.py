@@ -3,58 +3,304 @@
 """A github org client
 """
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import (
+    Any,
     List,
     Dict,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
 )
 
+from transport import HTTPTransport
+
 from utils import (
+    async_get_json,
+    async_memoize,
+    clear_memoized,
+    compile_path,
     get_json,
-    access_nested_map,
+    iter_json_items,
+    iter_json_pages,
     memoize,
 )
 
+_LICENSE_KEY = compile_path(("license", "key"), default=None)
+
+
+class Repo:
+    """Compact record of a public repo.
+
+    Only the name and license key are kept, in slots, instead of the
+    whole GitHub payload. `with_fields` derives a record type keeping
+    more top-level fields.
+    """
+    __slots__ = ("name", "license_key")
+    FIELDS: Tuple[str, ...] = ()
+    _types: Dict[Tuple[type, Tuple[str, ...]], type] = {}
+
+    def __init__(self, name: str, license_key: Optional[str] = None,
+                 **fields: Any) -> None:
+        """Init method of Repo"""
+        self.name = name
+        self.license_key = license_key
+        for field in self.FIELDS:
+            setattr(self, field, fields.get(field))
+
+    @classmethod
+    def from_payload(cls, repo: Dict) -> "Repo":
+        """Record of a repo of the GitHub payload"""
+        return cls(repo["name"], _LICENSE_KEY(repo),
+                   **{field: repo.get(field) for field in cls.FIELDS})
+
+    @classmethod
+    def with_fields(cls, *fields: str) -> Type["Repo"]:
+        """Record type also keeping the given top-level fields"""
+        fields = tuple(field for field in dict.fromkeys(fields)
+                       if field not in cls.FIELDS + Repo.__slots__)
+        if not fields:
+            return cls
+        key = (cls, fields)
+        if key not in Repo._types:
+            Repo._types[key] = type(cls.__name__, (cls,), {
+                "__slots__": fields, "FIELDS": cls.FIELDS + fields})
+        return Repo._types[key]
+
+    def _values(self) -> Tuple:
+        """Values of every slot"""
+        return tuple(getattr(self, field)
+                     for field in Repo.__slots__ + self.FIELDS)
+
+    def __eq__(self, other: Any) -> bool:
+        """Records are equal when all their fields are"""
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __repr__(self) -> str:
+        """Representation of the record"""
+        return "{}({})".format(type(self).__name__, ", ".join(
+            "{}={!r}".format(field, value) for field, value in
+            zip(Repo.__slots__ + self.FIELDS, self._values())))
+
+
+class OrgRepos(NamedTuple):
+    """Public repos of an org, or the error raised fetching them
+    """
+    org: str
+    repos: Optional[List[str]]
+    error: Optional[Exception]
+
 
 class GithubOrgClient:
     """A Github org client
     """
     ORG_URL = "https://api.github.com/orgs/{org}"
+    PER_PAGE = 100
+    REPO_FIELDS = (("name",), ("license", "key"))
+    _license_key = _LICENSE_KEY
 
-    def __init__(self, org_name: str) -> None:
-        """Init method of GithubOrgClient"""
+    def __init__(self, org_name: str,
+                 transport: Optional[HTTPTransport] = None,
+                 stream: bool = False,
+                 repo_fields: Sequence[str] = ()) -> None:
+        """Init method of GithubOrgClient.
+
+        With stream, repos pages are decoded as they download and only
+        the REPO_FIELDS of each repo are kept. repo_fields are the extra
+        top-level fields kept in the `repos` records.
+        """
         self._org_name = org_name
+        self._transport = transport
+        self._stream = stream
+        self.repo_type = Repo.with_fields(*repo_fields)
+
+    def refresh(self) -> None:
+        """Forget memoized payloads, they are fetched again on next use"""
+        clear_memoized(self)
 
-    @memoize
+    @memoize(threadsafe=True)
     def org(self) -> Dict:
         """Memoize org"""
-        return get_json(self.ORG_URL.format(org=self._org_name))
+        return get_json(self.ORG_URL.format(org=self._org_name),
+                        transport=self._transport)
 
     @property
     def _public_repos_url(self) -> str:
         """Public repos URL"""
         return self.org["repos_url"]
 
-    @memoize
-    def repos_payload(self) -> Dict:
-        """Memoize repos payload"""
-        return get_json(self._public_repos_url)
+    def _iter_repos(self, per_page: Optional[int] = None
+                    ) -> Iterator[Dict]:
+        """Repos of every page, fetched one page at a time, `PER_PAGE`
+        per page by default"""
+        per_page = per_page or self.PER_PAGE
+        if self._stream:
+            fields = self.REPO_FIELDS + tuple(
+                (field,) for field in self.repo_type.FIELDS)
+            yield from iter_json_items(self._public_repos_url,
+                                       params={"per_page": per_page},
+                                       fields=fields,
+                                       transport=self._transport)
+            return
+        pages = iter_json_pages(self._public_repos_url,
+                                params={"per_page": per_page},
+                                transport=self._transport)
+        for page in pages:
+            yield from page
+
+    @memoize(threadsafe=True)
+    def repos_payload(self) -> List[Dict]:
+        """Memoize repos payload, all pages included"""
+        return list(self._iter_repos())
+
+    def iter_public_repos(self, license: str = None,
+                          per_page: Optional[int] = None
+                          ) -> Iterator[str]:
+        """Lazily yield public repos names as pages arrive.
+
+        Nothing is fetched beyond the page currently being read, so
+        callers can stop early. The result is not memoized, use
+        `public_repos` for repeated lookups.
+        """
+        for repo in self._iter_repos(per_page):
+            if license is None or self.has_license(repo, license):
+                yield repo["name"]
+
+    @memoize(threadsafe=True)
+    def repos(self) -> List[Repo]:
+        """Memoize compact repos records, all pages included.
+
+        They are built from `repos_payload`, so either can be read first
+        and the pages are fetched once. With stream, the pages are rather
+        converted as they arrive and never kept whole unless the payload
+        was already fetched; `repos_payload` is then independent, and
+        reading it afterwards fetches every page again.
+        """
+        payload = GithubOrgClient.repos_payload.peek(self)
+        if payload is None:
+            payload = self._iter_repos() if self._stream \
+                else self.repos_payload
+        return [self.repo_type.from_payload(repo) for repo in payload]
+
+    @memoize(threadsafe=True)
+    def license_index(self) -> Dict[Optional[str], List[str]]:
+        """Memoize public repos names by license key, in payload order.
+        Repos without a license are under the None key."""
+        index: Dict[Optional[str], List[str]] = {}
+        for repo in self.repos:
+            index.setdefault(repo.license_key, []).append(repo.name)
+        return index
 
     def public_repos(self, license: str = None) -> List[str]:
         """Public repos"""
-        json_payload = self.repos_payload
-        public_repos = [
-            repo["name"] for repo in json_payload
-            if license is None or self.has_license(repo, license)
-        ]
+        if license is None:
+            return [repo.name for repo in self.repos]
+        return list(self.license_index.get(license, []))
+
+    def public_repos_by_license(self, licenses: Iterable[Optional[str]]
+                                ) -> Dict[Optional[str], List[str]]:
+        """Public repos of each of the given licenses; None stands for
+        the repos without a license"""
+        index = self.license_index
+        return {license: list(index.get(license, []))
+                for license in licenses}
 
-        return public_repos
+    @classmethod
+    def bulk_public_repos(cls, orgs: Iterable[str], license: str = None,
+                          max_workers: int = 8,
+                          transport: Optional[HTTPTransport] = None
+                          ) -> Iterator[OrgRepos]:
+        """Public repos of many orgs, fetched over a thread pool.
+
+        At most max_workers orgs are fetched at the same time. Results
+        are yielded as soon as each org completes; an org that fails is
+        reported with its error and does not abort the batch. Orgs not
+        started yet are cancelled if the caller stops iterating.
+        """
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        futures = {
+            executor.submit(cls(org, transport).public_repos, license): org
+            for org in orgs
+        }
+        try:
+            for future in as_completed(futures):
+                error = future.exception()
+                yield OrgRepos(futures[future],
+                               None if error else future.result(), error)
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
 
     @staticmethod
     def has_license(repo: Dict[str, Dict], license_key: str) -> bool:
         """Static: has_license"""
         assert license_key is not None, "license_key cannot be None"
-        try:
-            has_license = access_nested_map(repo, ("license", "key")) == license_key
-        except KeyError:
-            return False
-        return has_license
+        return GithubOrgClient._license_key(repo) == license_key
+
+
+class AsyncGithubOrgClient:
+    """An asyncio Github org client
+    """
+    ORG_URL = GithubOrgClient.ORG_URL
+    PER_PAGE = GithubOrgClient.PER_PAGE
+
+    def __init__(self, org_name: str,
+                 transport: Optional[HTTPTransport] = None) -> None:
+        """Init method of AsyncGithubOrgClient"""
+        self._org_name = org_name
+        self._transport = transport
+
+    @async_memoize
+    async def org(self) -> Dict:
+        """Memoize org"""
+        return await async_get_json(self.ORG_URL.format(org=self._org_name),
+                                    transport=self._transport)
+
+    async def _public_repos_url(self) -> str:
+        """Public repos URL"""
+        return (await self.org())["repos_url"]
+
+    @async_memoize
+    async def repos_payload(self) -> List[Dict]:
+        """Memoize repos payload, all pages included"""
+        pages = iter_json_pages(await self._public_repos_url(),
+                                params={"per_page": self.PER_PAGE},
+                                transport=self._transport)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, lambda: [repo for page in pages for repo in page])
+
+    async def public_repos(self, license: str = None) -> List[str]:
+        """Public repos"""
+        json_payload = await self.repos_payload()
+        return [
+            repo["name"] for repo in json_payload
+            if license is None or GithubOrgClient.has_license(repo, license)
+        ]
+
+    @classmethod
+    async def gather_public_repos(
+            cls, orgs: Sequence[str], license: str = None,
+            max_concurrency: int = 10,
+            transport: Optional[HTTPTransport] = None
+            ) -> Dict[str, List[str]]:
+        """Public repos of several orgs, at most max_concurrency orgs
+        being fetched at any time"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def org_public_repos(org_name: str) -> List[str]:
+            """Public repos of a single org, within the semaphore"""
+            async with semaphore:
+                return await cls(org_name, transport).public_repos(license)
+
+        repos = await asyncio.gather(*[org_public_repos(org_name)
+                                       for org_name in orgs])
+        return dict(zip(orgs, repos))
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""Metrics registry for the github org client.
+
+Nothing is recorded until a registry is installed:
+>>> registry = set_registry(MetricsRegistry())
+>>> GithubOrgClient("google").public_repos()
+>>> print(get_registry().to_text())
+"""
+import json
+import threading
+from bisect import bisect_left
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+__all__ = [
+    "BYTES_BUCKETS",
+    "Histogram",
+    "MetricsRegistry",
+    "NullRegistry",
+    "SECONDS_BUCKETS",
+    "get_registry",
+    "set_registry",
+]
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = tuple(2 ** power for power in range(8, 27, 2))
+
+Labels = Tuple[Tuple[str, Any], ...]
+
+
+class Histogram:
+    """Counts of observed values per bucket, with their sum and range
+    """
+
+    def __init__(self, bounds: Sequence[float] = SECONDS_BUCKETS) -> None:
+        """Init method of Histogram"""
+        self.bounds = tuple(sorted(bounds))
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float) -> None:
+        """Record value"""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th quantile
+        (0 <= q <= 1), capped by the largest value seen"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank and seen:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summary of the observed values"""
+        buckets = {"le_{:g}".format(bound): count
+                   for bound, count in zip(self.bounds, self.counts)}
+        buckets["le_inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+
+def _series(name: str, labels: Labels) -> str:
+    """Name of a series, e.g. ``http.requests{status=200}``"""
+    if not labels:
+        return name
+    return "{}{{{}}}".format(name, ",".join(
+        "{}={}".format(key, value) for key, value in labels))
+
+
+class MetricsRegistry:
+    """Thread-safe store of counters and histograms, keyed by metric name
+    and labels.
+    Recorded metrics
+    ----------------
+    http.request.seconds{url}, http.response.bytes{url}: latency and body
+        size of every request sent by `HTTPTransport`
+    http.requests{status}, http.retries, http.cache{result}: counts of
+        responses, urllib3 retries and response cache lookups
+    ratelimit.wait.seconds: time spent waiting on the `RateLimiter`
+    get_json.seconds{url}: latency of `get_json`, cache and sharing included
+    memoize{name,result}, memoize.compute.seconds{name}: hits and misses
+        of memoized properties, and time spent computing them
+    """
+    enabled = True
+
+    def __init__(self, seconds_buckets: Sequence[float] = SECONDS_BUCKETS,
+                 bytes_buckets: Sequence[float] = BYTES_BUCKETS) -> None:
+        """Init method of MetricsRegistry"""
+        self.seconds_buckets = seconds_buckets
+        self.bytes_buckets = bytes_buckets
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, metric: str, amount: float = 1,
+                  **labels: Any) -> None:
+        """Add amount to a counter"""
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, metric: str, value: float, **labels: Any) -> None:
+        """Record value in a histogram; metrics ending in ``.bytes`` use
+        size buckets, all others use latency buckets"""
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = Histogram(self.bytes_buckets
+                                      if metric.endswith(".bytes")
+                                      else self.seconds_buckets)
+                self._histograms[key] = histogram
+            histogram.observe(value)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current value of every counter and histogram"""
+        with self._lock:
+            return {
+                "counters": {_series(name, labels): value
+                             for (name, labels), value
+                             in sorted(self._counters.items())},
+                "histograms": {_series(name, labels): histogram.snapshot()
+                               for (name, labels), histogram
+                               in sorted(self._histograms.items())},
+            }
+
+    def to_json(self, **kwargs: Any) -> str:
+        """Snapshot as a JSON document"""
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_text(self) -> str:
+        """Snapshot as plain text, one series per line"""
+        snapshot = self.snapshot()
+        lines: List[str] = ["{} {:g}".format(series, value) for series, value
+                            in snapshot["counters"].items()]
+        for series, summary in snapshot["histograms"].items():
+            lines.append("{} count={} mean={:.6g} p50={:.6g} p99={:.6g} "
+                         "max={:.6g}".format(series, summary["count"],
+                                             summary["mean"], summary["p50"],
+                                             summary["p99"], summary["max"]))
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """Forget every recorded value"""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+class NullRegistry(MetricsRegistry):
+    """Registry recording nothing, the default.
+    Instrumented code checks `enabled` before even reading the clock.
+    """
+    enabled = False
+
+    def increment(self, metric: str, amount: float = 1,
+                  **labels: Any) -> None:
+        """Do nothing"""
+
+    def observe(self, metric: str, value: float, **labels: Any) -> None:
+        """Do nothing"""
+
+
+_registry: MetricsRegistry = NullRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """Return the process-wide registry.
+    """
+    return _registry
+
+
+def set_registry(registry: Optional[MetricsRegistry]) -> MetricsRegistry:
+    """Install the process-wide registry and return it; None restores the
+    no-op default.
+    """
+    global _registry
+    _registry = registry if registry is not None else NullRegistry()
+    return _registry
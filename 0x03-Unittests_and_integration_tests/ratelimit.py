@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Rate-limit governor for the GitHub API.
+"""
+import threading
+import time
+from typing import (
+    Any,
+    Dict,
+    Mapping,
+    Optional,
+)
+
+__all__ = [
+    "RateLimiter",
+]
+
+
+def _number_header(headers: Mapping, name: str) -> Optional[float]:
+    """Numeric value of a response header, None if absent or invalid"""
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Pace requests and hold them back when the API budget runs out.
+    Requests are spaced by a token bucket of `rate` requests per second
+    with bursts of up to `burst`. The remaining budget is tracked from the
+    ``X-RateLimit-Remaining``/``X-RateLimit-Reset`` headers, and once it
+    falls to `reserve` requests wait for the reset. A ``Retry-After``
+    header on a 403 or 429 holds every request for that long.
+    Parameters
+    ----------
+    rate: float
+        requests per second, None to only follow the headers
+    burst: int
+        requests allowed back to back
+    reserve: int
+        remaining budget kept unused before waiting for the reset
+    Example
+    -------
+    >>> transport = HTTPTransport(rate_limiter=RateLimiter(rate=10))
+    >>> transport.rate_limiter.snapshot()["remaining"]
+    4999
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: int = 1,
+                 reserve: int = 0) -> None:
+        """Init method of RateLimiter"""
+        self.rate = rate
+        self.burst = burst
+        self.reserve = reserve
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.retry_at: Optional[float] = None
+        self.waits = 0
+        self.waited = 0.0
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _delay(self) -> float:
+        """Seconds the next request must wait, reserving its slot"""
+        delay = 0.0
+        if self.rate is not None:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens
+                               + (now - self._refilled_at) * self.rate)
+            self._refilled_at = now
+            # a negative balance queues the request behind earlier ones
+            self._tokens -= 1
+            if self._tokens < 0:
+                delay = -self._tokens / self.rate
+
+        now = time.time()
+        if self.reset_at is not None and now >= self.reset_at:
+            self.remaining = self.reset_at = None
+        if self.remaining is not None:
+            if self.remaining <= self.reserve:
+                delay = max(delay, self.reset_at - now)
+            else:
+                self.remaining -= 1
+        if self.retry_at is not None:
+            delay = max(delay, self.retry_at - now)
+        return delay
+
+    def acquire(self) -> float:
+        """Block until a request may be sent, return the time waited"""
+        with self._lock:
+            delay = self._delay()
+            if delay > 0:
+                self.waits += 1
+                self.waited += delay
+        if delay > 0:
+            time.sleep(delay)
+        return max(delay, 0.0)
+
+    def update(self, response: Any) -> None:
+        """Track the budget advertised by a response"""
+        headers = response.headers
+        limit = _number_header(headers, "X-RateLimit-Limit")
+        remaining = _number_header(headers, "X-RateLimit-Remaining")
+        reset_at = _number_header(headers, "X-RateLimit-Reset")
+        retry_after = None
+        if response.status_code in (403, 429):
+            retry_after = _number_header(headers, "Retry-After")
+        with self._lock:
+            if limit is not None:
+                self.limit = int(limit)
+            if remaining is not None and reset_at is not None:
+                self.remaining = int(remaining)
+                self.reset_at = reset_at
+            if retry_after is not None:
+                self.retry_at = time.time() + retry_after
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current budget and time spent waiting, for monitoring"""
+        with self._lock:
+            now = time.time()
+            return {
+                "limit": self.limit,
+                "remaining": self.remaining,
+                "reset_in": None if self.reset_at is None
+                else max(0.0, self.reset_at - now),
+                "retry_in": None if self.retry_at is None
+                else max(0.0, self.retry_at - now),
+                "waits": self.waits,
+                "waited": self.waited,
+            }
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+"""
+This module contains unit tests for the HTTP response cache
+in the 'cache' module.
+"""
+
+import tempfile
+import time
+import unittest
+import requests
+from parameterized import parameterized, param
+from cache import CachedResponse, ResponseCache, SQLiteCache
+from typing import Dict
+
+
+def make_response(status_code: int, headers: Dict,
+                  content: bytes = b'{"payload": true}') -> requests.Response:
+    """
+    Build a requests.Response without any network access.
+    """
+    response = requests.Response()
+    response.status_code = status_code
+    response.url = "http://example.com"
+    response.headers.update(headers)
+    response._content = content
+    return response
+
+
+class TestCachedResponse(unittest.TestCase):
+    """
+    Test case for the CachedResponse entries.
+    """
+
+    @parameterized.expand([
+        param(headers={"ETag": '"abc"'},
+              expected={"If-None-Match": '"abc"'}),
+        param(headers={"Last-Modified": "Mon, 01 Jul 2024 00:00:00 GMT"},
+              expected={"If-Modified-Since":
+                        "Mon, 01 Jul 2024 00:00:00 GMT"}),
+    ])
+    def test_validators(self, headers: Dict, expected: Dict) -> None:
+        """
+        Test that the conditional headers match the response validators.
+
+        Args:
+            headers (dict): The headers of the cached response.
+            expected (dict): The expected conditional request headers.
+
+        Returns:
+            None
+        """
+        entry = CachedResponse.from_response(make_response(200, headers))
+        self.assertEqual(entry.validators(), expected)
+
+    def test_not_cacheable(self) -> None:
+        """
+        Test that unsuccessful responses are not cached.
+
+        Returns:
+            None
+        """
+        self.assertIsNone(CachedResponse.from_response(
+            make_response(404, {"ETag": '"abc"'})))
+
+    def test_to_response(self) -> None:
+        """
+        Test that a cached entry rebuilds an equivalent response.
+
+        Returns:
+            None
+        """
+        original = make_response(200, {
+            "ETag": '"abc"',
+            "Link": '<http://example.com?page=2>; rel="next"'})
+        response = CachedResponse.from_response(original).to_response()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"payload": True})
+        self.assertEqual(response.links, original.links)
+
+
+class TestResponseCache(unittest.TestCase):
+    """
+    Test case for the ResponseCache store.
+    """
+
+    def test_lru_eviction(self) -> None:
+        """
+        Test that the least recently used entry is dropped first.
+
+        Returns:
+            None
+        """
+        cache = ResponseCache(maxsize=2)
+        entry = CachedResponse.from_response(
+            make_response(200, {"ETag": '"abc"'}))
+        cache.set("a", entry)
+        cache.set("b", entry)
+        cache.get("a")
+        cache.set("c", entry)
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+
+    @parameterized.expand([
+        param(ttl=None, headers={}, kept=False),
+        param(ttl=None, headers={"ETag": '"abc"'}, kept=True),
+        param(ttl=60, headers={}, kept=True),
+    ])
+    def test_accepts(self, ttl, headers: Dict, kept: bool) -> None:
+        """
+        Test that without a ttl only revalidatable responses are kept.
+
+        Args:
+            ttl (float): The time-to-live of the cache.
+            headers (dict): The headers of the response.
+            kept (bool): Whether the response should be cached.
+
+        Returns:
+            None
+        """
+        cache = ResponseCache(ttl=ttl)
+        cache.set("a", CachedResponse.from_response(
+            make_response(200, headers)))
+        self.assertEqual(cache.get("a") is not None, kept)
+
+    def test_fresh(self) -> None:
+        """
+        Test that entries are fresh for ttl seconds only.
+
+        Returns:
+            None
+        """
+        entry = CachedResponse.from_response(make_response(200, {}))
+        self.assertFalse(ResponseCache().fresh(entry))
+        self.assertTrue(ResponseCache(ttl=60).fresh(entry))
+        self.assertFalse(ResponseCache(ttl=60).fresh(
+            entry._replace(stored_at=time.time() - 61)))
+
+
+class TestSQLiteCache(unittest.TestCase):
+    """
+    Test case for the SQLiteCache store.
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a temporary cache directory.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_persistence(self) -> None:
+        """
+        Test that entries written by one cache are read by another one
+        opened on the same directory.
+
+        Returns:
+            None
+        """
+        entry = CachedResponse.from_response(
+            make_response(200, {"ETag": '"abc"'}))
+        SQLiteCache(self.directory.name, ttl=60).set("a", entry)
+
+        cache = SQLiteCache(self.directory.name, ttl=60)
+        self.assertEqual(cache.get("a"), entry)
+        self.assertTrue(cache.fresh(cache.get("a")))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 1)
+
+    def test_max_bytes(self) -> None:
+        """
+        Test that the oldest entries are evicted past max_bytes.
+
+        Returns:
+            None
+        """
+        cache = SQLiteCache(self.directory.name, ttl=60, max_bytes=20)
+        for stored_at, key in enumerate("abc"):
+            cache.set(key, CachedResponse(
+                "http://example.com", {}, b"0123456789", stored_at))
+
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertEqual(cache.stats()["bytes"], 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
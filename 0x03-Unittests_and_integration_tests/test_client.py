@@ -8,10 +8,13 @@ Author: [Fabrice Eklou]
 Date: [June 30, 2024]
 """
 
+import asyncio
+import threading
+import time
 import unittest
 from unittest.mock import Mock, MagicMock, patch, PropertyMock
 from parameterized import parameterized, param, parameterized_class
-from client import GithubOrgClient
+from client import AsyncGithubOrgClient, GithubOrgClient, OrgRepos, Repo
 from fixtures import TEST_PAYLOAD
 from utils import get_json
 from typing import List, Dict, Union
@@ -55,7 +58,28 @@ class TestGithubOrgClient(unittest.TestCase):
 
         self.assertEqual(github_client.org, payload)
         mock_get_json.assert_called_once_with(
-            'https://api.github.com/orgs/{}'.format(org_name))
+            'https://api.github.com/orgs/{}'.format(org_name),
+            transport=None)
+
+    @patch('client.get_json')
+    def test_refresh(self, mock_get_json) -> None:
+        """
+        Test that refresh makes org fetched again on next access.
+
+        Args:
+            mock_get_json: Mock object for the get_json function.
+
+        Returns:
+            None
+        """
+        mock_get_json.side_effect = [{"login": "v1"}, {"login": "v2"}]
+        github_client = GithubOrgClient('google')
+
+        self.assertEqual(github_client.org, {"login": "v1"})
+        self.assertEqual(github_client.org, {"login": "v1"})
+        github_client.refresh()
+        self.assertEqual(github_client.org, {"login": "v2"})
+        self.assertEqual(mock_get_json.call_count, 2)
 
     @parameterized.expand([
         param(org_name='google'),
@@ -84,16 +108,14 @@ class TestGithubOrgClient(unittest.TestCase):
             self.assertEqual(github_client._public_repos_url, repos_url)
             mock_org.assert_called_once()
 
-    @patch('client.get_json')
-    def test_public_repos(self, mock_get_json):
+    @patch('client.iter_json_pages')
+    def test_public_repos(self, mock_iter_json_pages):
         """
         Test case for the public_repos method of the GithubOrgClient class.
 
         Args:
-            mock_get_json (MagicMock): A mock object for the get_json method.
-            license (Union[str, None]): The license key for the repository.
-                Can be None.
-            name (str): The name of the repository.
+            mock_iter_json_pages (MagicMock): A mock object for the
+                iter_json_pages function.
 
         Returns:
             None
@@ -104,7 +126,7 @@ class TestGithubOrgClient(unittest.TestCase):
             {"name": "ReactJS", "license": {"key": "apache-2.0"}},
             {"name": "PostgreSQL", "license": {"key": "BSD"}},
         ]
-        mock_get_json.return_value = payload
+        mock_iter_json_pages.return_value = iter([payload[:2], payload[2:]])
 
         with patch('client.GithubOrgClient._public_repos_url',
                    new_callable=PropertyMock) as mock_pru:
@@ -114,9 +136,214 @@ class TestGithubOrgClient(unittest.TestCase):
             repos = github_client.public_repos()
 
             self.assertEqual(repos, ["NestJS", "ReactJS", "PostgreSQL"])
-            mock_get_json.assert_called_once_with('http://xclr.io')
+            self.assertEqual(github_client.public_repos(), repos)
+            mock_iter_json_pages.assert_called_once_with(
+                'http://xclr.io', params={'per_page': 100}, transport=None)
             mock_pru.assert_called_once()
 
+    @patch('client.iter_json_items')
+    def test_public_repos_stream(self, mock_iter_json_items) -> None:
+        """
+        Test that stream mode decodes repos pages with a projection.
+
+        Args:
+            mock_iter_json_items (MagicMock): A mock object for the
+                iter_json_items function.
+
+        Returns:
+            None
+        """
+        mock_iter_json_items.return_value = iter([
+            {"name": "NestJS", "license": {"key": "MIT"}},
+            {"name": "ReactJS"},
+        ])
+        with patch('client.GithubOrgClient._public_repos_url',
+                   new_callable=PropertyMock) as mock_pru:
+            mock_pru.return_value = 'http://xclr.io'
+            github_client = GithubOrgClient('xclr', stream=True)
+
+            self.assertEqual(github_client.public_repos("MIT"), ["NestJS"])
+            mock_iter_json_items.assert_called_once_with(
+                'http://xclr.io', params={'per_page': 100},
+                fields=GithubOrgClient.REPO_FIELDS, transport=None)
+
+    def test_license_index(self) -> None:
+        """
+        Test that the license index groups repos by license key and
+        answers filtered queries without rescanning the payload.
+
+        Returns:
+            None
+        """
+        payload = [
+            {"name": "NestJS", "license": {"key": "MIT"}},
+            {"name": "ReactJS", "license": None},
+            {"name": "PostgreSQL", "license": {"key": "MIT"}},
+            {"name": "Linux"},
+        ]
+        with patch.object(GithubOrgClient, '_iter_repos',
+                          return_value=iter(payload)) as mock_payload:
+            github_client = GithubOrgClient('xclr')
+
+            self.assertEqual(github_client.license_index,
+                             {"MIT": ["NestJS", "PostgreSQL"],
+                              None: ["ReactJS", "Linux"]})
+            with patch.object(GithubOrgClient, 'has_license') as mock_has:
+                self.assertEqual(github_client.public_repos_by_license(
+                    ["MIT", "BSD", None]),
+                    {"MIT": ["NestJS", "PostgreSQL"], "BSD": [],
+                     None: ["ReactJS", "Linux"]})
+                mock_has.assert_not_called()
+            mock_payload.assert_called_once()
+
+    def test_repos(self) -> None:
+        """
+        Test that repos keeps compact records of the payload, reusing
+        the raw payload when it was already fetched.
+
+        Returns:
+            None
+        """
+        payload = [
+            {"name": "NestJS", "license": {"key": "MIT"}, "forks": 3},
+            {"name": "ReactJS", "license": None, "forks": 5},
+        ]
+        with patch.object(GithubOrgClient, '_iter_repos',
+                          side_effect=lambda: iter(payload)) as mock_repos:
+            github_client = GithubOrgClient('xclr', repo_fields=["forks"])
+            self.assertEqual(github_client.repos_payload, payload)
+            repos = github_client.repos
+
+        mock_repos.assert_called_once()
+        self.assertEqual([(repo.name, repo.license_key, repo.forks)
+                          for repo in repos],
+                         [("NestJS", "MIT", 3), ("ReactJS", None, 5)])
+        self.assertFalse(hasattr(repos[0], "__dict__"))
+
+    def test_repos_then_payload(self) -> None:
+        """
+        Test that reading public_repos before repos_payload fetches the
+        pages once.
+
+        Returns:
+            None
+        """
+        payload = [{"name": "NestJS", "license": {"key": "MIT"}}]
+        with patch.object(GithubOrgClient, '_iter_repos',
+                          side_effect=lambda: iter(payload)) as mock_repos:
+            github_client = GithubOrgClient('xclr')
+            self.assertEqual(github_client.public_repos(), ["NestJS"])
+            self.assertEqual(github_client.repos_payload, payload)
+
+        mock_repos.assert_called_once()
+
+    def test_repo_with_fields(self) -> None:
+        """
+        Test the record types keeping extra fields.
+
+        Returns:
+            None
+        """
+        repo_type = Repo.with_fields("forks", "name", "forks")
+
+        self.assertIs(Repo.with_fields("forks"), repo_type)
+        self.assertIs(Repo.with_fields(), Repo)
+        self.assertEqual(repo_type.FIELDS, ("forks",))
+        self.assertEqual(repo_type.from_payload({"name": "a"}),
+                         repo_type("a", None, forks=None))
+        self.assertNotEqual(Repo("a"), repo_type("a"))
+        self.assertEqual(repr(Repo("a", "mit")),
+                         "Repo(name='a', license_key='mit')")
+
+    def test_iter_public_repos(self) -> None:
+        """
+        Test that iter_public_repos only fetches the pages it needs.
+
+        Returns:
+            None
+        """
+        fetched = []
+
+        def pages(url, params=None, transport=None):
+            """Fake paginated endpoint recording each fetched page"""
+            for page in ([{"name": "a", "license": {"key": "MIT"}}],
+                         [{"name": "b", "license": None}],
+                         [{"name": "c", "license": {"key": "MIT"}}]):
+                fetched.append(page)
+                yield page
+
+        with patch('client.GithubOrgClient._public_repos_url',
+                   new_callable=PropertyMock) as mock_pru, \
+                patch('client.iter_json_pages', side_effect=pages):
+            mock_pru.return_value = 'http://xclr.io'
+            github_client = GithubOrgClient('xclr')
+
+            repos = github_client.iter_public_repos()
+            self.assertEqual(next(repos), "a")
+            self.assertEqual(len(fetched), 1)
+
+            self.assertEqual(list(github_client.iter_public_repos("MIT")),
+                             ["a", "c"])
+
+    def test_per_page_override(self) -> None:
+        """
+        Test that a subclass's PER_PAGE reaches iter_json_pages.
+
+        Returns:
+            None
+        """
+        class SmallPages(GithubOrgClient):
+            """Client fetching 50 repos per page"""
+            PER_PAGE = 50
+
+        with patch('client.GithubOrgClient._public_repos_url',
+                   new_callable=PropertyMock) as mock_pru, \
+                patch('client.iter_json_pages',
+                      return_value=iter([])) as mock_pages:
+            mock_pru.return_value = 'http://xclr.io'
+            self.assertEqual(SmallPages('xclr').repos_payload, [])
+            mock_pages.assert_called_once_with(
+                'http://xclr.io', params={'per_page': 50}, transport=None)
+
+    def test_bulk_public_repos(self) -> None:
+        """
+        Test that bulk_public_repos reports every org, failures included,
+        without running more than max_workers fetches at once.
+
+        Returns:
+            None
+        """
+        lock = threading.Lock()
+        running, peak = [0], [0]
+
+        def public_repos(self, license=None):
+            """Fake public_repos tracking concurrent fetches"""
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            if self._org_name == "broken":
+                raise ConnectionError("broken")
+            return [self._org_name + "-repo"]
+
+        orgs = ["org0", "broken", "org1", "org2"]
+        with patch.object(GithubOrgClient, 'public_repos', public_repos):
+            results = list(GithubOrgClient.bulk_public_repos(
+                orgs, max_workers=2))
+
+        self.assertEqual(sorted(result.org for result in results),
+                         sorted(orgs))
+        for result in results:
+            if result.org == "broken":
+                self.assertIsNone(result.repos)
+                self.assertIsInstance(result.error, ConnectionError)
+            else:
+                self.assertEqual(result, OrgRepos(
+                    result.org, [result.org + "-repo"], None))
+        self.assertEqual(peak[0], 2)
+
     @parameterized.expand([
         param(repo={"license": {"key": "my_license"}},
               license_key="my_license",
@@ -150,6 +377,66 @@ class TestGithubOrgClient(unittest.TestCase):
             self.assertFalse(has_license)
 
 
+class TestAsyncGithubOrgClient(unittest.TestCase):
+    """
+    Test class for the AsyncGithubOrgClient class.
+    """
+
+    def test_org_coalesces_concurrent_awaits(self) -> None:
+        """
+        Test that concurrent awaits of org() send a single request.
+
+        Returns:
+            None
+        """
+        calls = []
+
+        async def fake_get_json(url, transport=None):
+            """Record the URL and answer after yielding control"""
+            calls.append(url)
+            await asyncio.sleep(0)
+            return {"repos_url": url + "/repos"}
+
+        async def main():
+            """Await org() concurrently from several tasks"""
+            github_client = AsyncGithubOrgClient("google")
+            return await asyncio.gather(
+                *[github_client.org() for _ in range(3)])
+
+        with patch('client.async_get_json', side_effect=fake_get_json):
+            orgs = asyncio.run(main())
+
+        self.assertEqual(calls, ['https://api.github.com/orgs/google'])
+        self.assertEqual(orgs, [{"repos_url": calls[0] + "/repos"}] * 3)
+
+    def test_gather_public_repos(self) -> None:
+        """
+        Test that gather_public_repos fetches every org without
+        exceeding max_concurrency.
+
+        Returns:
+            None
+        """
+        running, peak = [0], [0]
+
+        async def public_repos(self, license=None):
+            """Fake public_repos tracking concurrent fetches"""
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            await asyncio.sleep(0.01)
+            running[0] -= 1
+            return [self._org_name + "-repo"]
+
+        orgs = ["org{}".format(i) for i in range(6)]
+        with patch.object(AsyncGithubOrgClient, 'public_repos',
+                          public_repos):
+            repos = asyncio.run(AsyncGithubOrgClient.gather_public_repos(
+                orgs, max_concurrency=2))
+
+        self.assertEqual(repos, {org: [org + "-repo"] for org in orgs})
+        self.assertEqual(peak[0], 2)
+
+
 @parameterized_class(
     ("org_payload", "repos_payload", "expected_repos", "apache2_repos"),
     TEST_PAYLOAD
@@ -189,13 +476,14 @@ class TestIntegrationGithubOrgClient(unittest.TestCase):
         Set up the necessary patching for the tests.
 
         This class method is called before any test methods in the class.
-        It sets up the patching for the 'requests.get'
-        method to return the desired payloads.
+        It sets up the patching for the 'requests.Session.get'
+        method used by the pooled transport to return the desired payloads.
         """
-        cls.get_patcher = patch('requests.get',
+        cls.get_patcher = patch('requests.Session.get',
                                 **{'return_value.json.side_effect':
                                     [cls.org_payload, cls.repos_payload,
-                                     cls.org_payload, cls.repos_payload]})
+                                     cls.org_payload, cls.repos_payload],
+                                   'return_value.links': {}})
 
         cls.mock = cls.get_patcher.start()
 
@@ -206,7 +494,7 @@ class TestIntegrationGithubOrgClient(unittest.TestCase):
 
         This class method is called after all test methods
         in the class have been run.
-        It stops the patching for the 'requests.get' method.
+        It stops the patching for the 'requests.Session.get' method.
         """
         cls.get_patcher.stop()
 
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+"""
+This module contains unit tests for the metrics registry
+in the 'metrics' module, and for the instrumentation of the
+transport and the memoize decorator.
+"""
+
+import json
+import unittest
+from unittest.mock import patch
+from metrics import (Histogram, MetricsRegistry, NullRegistry,
+                     get_registry, set_registry)
+from cache import ResponseCache
+from test_cache import make_response
+from transport import HTTPTransport
+from utils import memoize
+
+
+class TestHistogram(unittest.TestCase):
+    """
+    Test case for the Histogram class.
+    """
+
+    def test_observe(self) -> None:
+        """
+        Test the summary of the observed values.
+
+        Returns:
+            None
+        """
+        histogram = Histogram(bounds=(1, 10, 100))
+        for value in (0.5, 5, 6, 7, 50, 500):
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["buckets"],
+                         {"le_1": 1, "le_10": 3, "le_100": 1, "le_inf": 1})
+        self.assertEqual((snapshot["count"], snapshot["min"],
+                          snapshot["max"]), (6, 0.5, 500))
+        self.assertEqual((snapshot["p50"], snapshot["p90"],
+                          snapshot["p99"]), (10, 500, 500))
+
+    def test_empty(self) -> None:
+        """
+        Test that an empty histogram has no quantiles.
+
+        Returns:
+            None
+        """
+        self.assertIsNone(Histogram().snapshot()["p50"])
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """
+    Test case for the metrics registries.
+    """
+
+    def setUp(self) -> None:
+        """
+        Install a fresh registry, restored to the no-op default after.
+        """
+        self.registry = set_registry(MetricsRegistry())
+        self.addCleanup(set_registry, None)
+
+    def test_snapshot(self) -> None:
+        """
+        Test the snapshot of counters and histograms and its exports.
+
+        Returns:
+            None
+        """
+        self.registry.increment("http.requests", status=200)
+        self.registry.increment("http.requests", 2, status=200)
+        self.registry.observe("http.response.bytes", 300, url="/a")
+
+        snapshot = self.registry.snapshot()
+        self.assertEqual(snapshot["counters"],
+                         {"http.requests{status=200}": 3})
+        self.assertEqual(
+            snapshot["histograms"]["http.response.bytes{url=/a}"]["buckets"]
+            ["le_1024"], 1)
+        self.assertEqual(json.loads(self.registry.to_json()), snapshot)
+        self.assertIn("http.requests{status=200} 3",
+                      self.registry.to_text())
+
+    def test_default_registry(self) -> None:
+        """
+        Test that the default registry records nothing.
+
+        Returns:
+            None
+        """
+        registry = set_registry(None)
+        registry.increment("a")
+        registry.observe("b", 1)
+
+        self.assertIsInstance(get_registry(), NullRegistry)
+        self.assertFalse(registry.enabled)
+        self.assertEqual(registry.snapshot(),
+                         {"counters": {}, "histograms": {}})
+
+    def test_transport_metrics(self) -> None:
+        """
+        Test that requests record latency, size, status and cache lookups.
+
+        Returns:
+            None
+        """
+        transport = HTTPTransport(cache=ResponseCache())
+        with patch('requests.Session.get',
+                   return_value=make_response(200, {}, b'[1, 2]')):
+            transport.get("http://example.com/orgs?page=2")
+
+        snapshot = self.registry.snapshot()
+        self.assertEqual(snapshot["counters"],
+                         {"http.cache{result=miss}": 1,
+                          "http.requests{status=200}": 1})
+        histograms = snapshot["histograms"]
+        self.assertEqual(
+            histograms["http.request.seconds{url=http://example.com/orgs}"]
+            ["count"], 1)
+        self.assertEqual(
+            histograms["http.response.bytes{url=http://example.com/orgs}"]
+            ["sum"], 6)
+
+    def test_memoize_metrics(self) -> None:
+        """
+        Test that memoized properties record hits, misses and timings;
+        hits are counted for properties read through the descriptor,
+        as those with a ttl are.
+
+        Returns:
+            None
+        """
+        class TestClass:
+            """
+            This is a test class with a memoized property.
+            """
+
+            @memoize(ttl=60)
+            def a_property(self) -> int:
+                """
+                This property returns 42.
+                """
+                return 42
+
+        test_object = TestClass()
+        test_object.a_property
+        test_object.a_property
+
+        snapshot = self.registry.snapshot()
+        name = TestClass.a_property.__qualname__
+        self.assertEqual(
+            snapshot["counters"],
+            {"memoize{{name={},result=hit}}".format(name): 1,
+             "memoize{{name={},result=miss}}".format(name): 1})
+        self.assertEqual(snapshot["histograms"][
+            "memoize.compute.seconds{{name={}}}".format(name)]["count"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
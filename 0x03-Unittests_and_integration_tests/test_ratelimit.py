@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+"""
+This module contains unit tests for the rate-limit governor
+in the 'ratelimit' module.
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+from ratelimit import RateLimiter
+from typing import Dict
+
+
+def make_response(status_code: int, headers: Dict) -> Mock:
+    """
+    Build a response-like object carrying the given headers.
+    """
+    return Mock(status_code=status_code, headers=headers)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """
+    Test case for the RateLimiter class.
+    """
+
+    @patch('time.sleep')
+    def test_token_bucket(self, mock_sleep) -> None:
+        """
+        Test that requests beyond the burst are spaced by the rate.
+
+        Args:
+            mock_sleep: Mock object for the time.sleep function.
+
+        Returns:
+            None
+        """
+        limiter = RateLimiter(rate=10, burst=2)
+        with patch('time.monotonic', return_value=limiter._refilled_at):
+            waits = [limiter.acquire() for _ in range(4)]
+
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertAlmostEqual(waits[2], 0.1)
+        self.assertAlmostEqual(waits[3], 0.2)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    @patch('time.sleep')
+    @patch('time.time', return_value=1000.0)
+    def test_exhausted_budget(self, mock_time, mock_sleep) -> None:
+        """
+        Test that requests wait for the reset once the budget is spent.
+
+        Args:
+            mock_time: Mock object for the time.time function.
+            mock_sleep: Mock object for the time.sleep function.
+
+        Returns:
+            None
+        """
+        limiter = RateLimiter()
+        limiter.update(make_response(200, {
+            "X-RateLimit-Limit": "60",
+            "X-RateLimit-Remaining": "1",
+            "X-RateLimit-Reset": "1030"}))
+
+        self.assertEqual(limiter.acquire(), 0.0)
+        self.assertEqual(limiter.acquire(), 30.0)
+        mock_sleep.assert_called_once_with(30.0)
+        snapshot = limiter.snapshot()
+        self.assertEqual((snapshot["limit"], snapshot["remaining"],
+                          snapshot["reset_in"], snapshot["waits"]),
+                         (60, 0, 30.0, 1))
+
+        mock_time.return_value = 1030.0
+        self.assertEqual(limiter.acquire(), 0.0)
+        self.assertIsNone(limiter.snapshot()["remaining"])
+
+    @patch('time.sleep')
+    @patch('time.time', return_value=1000.0)
+    def test_retry_after(self, mock_time, mock_sleep) -> None:
+        """
+        Test that a Retry-After answer holds the next requests.
+
+        Args:
+            mock_time: Mock object for the time.time function.
+            mock_sleep: Mock object for the time.sleep function.
+
+        Returns:
+            None
+        """
+        limiter = RateLimiter()
+        limiter.update(make_response(200, {"Retry-After": "5"}))
+        self.assertEqual(limiter.acquire(), 0.0)
+
+        limiter.update(make_response(429, {"Retry-After": "5"}))
+        self.assertEqual(limiter.acquire(), 5.0)
+        mock_sleep.assert_called_once_with(5.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+"""
+This module contains unit tests for the pooled HTTP transport
+in the 'transport' module.
+"""
+
+import threading
+import unittest
+from unittest.mock import patch
+from cache import ResponseCache
+from ratelimit import RateLimiter
+from test_cache import make_response
+from transport import HTTPTransport, get_transport, set_transport
+
+
+class TestHTTPTransport(unittest.TestCase):
+    """
+    Test case for the HTTPTransport class.
+    """
+
+    def test_session_per_thread_shared_pool(self) -> None:
+        """
+        Test that each thread gets its own session, all mounted
+        on the same connection pool.
+
+        Returns:
+            None
+        """
+        transport = HTTPTransport(pool_maxsize=4)
+        sessions = [transport.session]
+        thread = threading.Thread(
+            target=lambda: sessions.append(transport.session))
+        thread.start()
+        thread.join()
+
+        self.assertIs(transport.session, sessions[0])
+        self.assertIsNot(sessions[0], sessions[1])
+        self.assertIs(sessions[0].get_adapter("https://api.github.com"),
+                      sessions[1].get_adapter("https://api.github.com"))
+
+    def test_get(self) -> None:
+        """
+        Test that get applies the default timeout and base_url.
+
+        Returns:
+            None
+        """
+        transport = HTTPTransport(timeout=2, base_url="http://127.0.0.1:81")
+        with patch('requests.Session.get') as mock_get:
+            transport.get("https://api.github.com/orgs/abc?page=2")
+
+        mock_get.assert_called_once_with(
+            "http://127.0.0.1:81/orgs/abc?page=2",
+            params=None, headers=None, timeout=2, stream=False)
+
+    def test_conditional_requests(self) -> None:
+        """
+        Test that cached responses are revalidated and served on 304.
+
+        Returns:
+            None
+        """
+        cache = ResponseCache()
+        transport = HTTPTransport(cache=cache)
+        responses = [make_response(200, {"ETag": '"abc"'}),
+                     make_response(304, {}, b''),
+                     make_response(200, {"ETag": '"def"'}, b'[1]')]
+        with patch('requests.Session.get',
+                   side_effect=responses) as mock_get:
+            first = transport.get("http://example.com")
+            second = transport.get("http://example.com")
+            third = transport.get("http://example.com")
+
+        self.assertIsNone(mock_get.call_args_list[0][1]["headers"])
+        self.assertEqual(mock_get.call_args_list[1][1]["headers"],
+                         {"If-None-Match": '"abc"'})
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(third.json(), [1])
+        self.assertEqual(cache.get("http://example.com/").validators(),
+                         {"If-None-Match": '"def"'})
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_fresh_entries_skip_the_network(self) -> None:
+        """
+        Test that entries younger than the cache ttl are served
+        without a request.
+
+        Returns:
+            None
+        """
+        transport = HTTPTransport(cache=ResponseCache(ttl=60))
+        with patch('requests.Session.get',
+                   return_value=make_response(200, {})) as mock_get:
+            first = transport.get("http://example.com")
+            second = transport.get("http://example.com")
+
+        mock_get.assert_called_once()
+        self.assertEqual(first.json(), second.json())
+
+    def test_rate_limiter(self) -> None:
+        """
+        Test that every request goes through the rate limiter.
+
+        Returns:
+            None
+        """
+        limiter = RateLimiter()
+        transport = HTTPTransport(rate_limiter=limiter)
+        response = make_response(200, {"X-RateLimit-Remaining": "41",
+                                       "X-RateLimit-Reset": "4102444800"})
+        with patch('requests.Session.get', return_value=response), \
+                patch.object(limiter, 'acquire') as mock_acquire:
+            transport.get("http://example.com")
+
+        mock_acquire.assert_called_once()
+        self.assertEqual(limiter.remaining, 41)
+
+    def test_default_transport(self) -> None:
+        """
+        Test that the shared transport can be replaced and restored.
+
+        Returns:
+            None
+        """
+        custom = HTTPTransport()
+        previous = set_transport(custom)
+        try:
+            self.assertIs(get_transport(), custom)
+        finally:
+            set_transport(previous)
+        self.assertIsInstance(get_transport(), HTTPTransport)
+        self.assertIsInstance(get_transport().cache, ResponseCache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,9 +7,17 @@ in the 'utils' module.
 The utility functions being tested are:
 - access_nested_map: A function that retrieves a value
     from a nested map given a path.
+- compile_path: A function that compiles a path into
+    a reusable accessor.
 - get_json: A function that retrieves JSON data from a given URL.
+- iter_json_pages: A generator that follows the pages of a
+    paginated resource.
+- iter_json_array / iter_json_items: Generators decoding JSON
+    arrays incrementally.
 - memoize: A decorator that caches the return
     value of a method or property.
+- async_get_json / async_memoize: Their asyncio counterparts.
+- SingleFlight: A class deduplicating identical calls in flight.
 
 The unit tests are implemented using the 'unittest'
 module and the 'parameterized' library.
@@ -19,10 +27,17 @@ Date: [June 28, 2024]
 """
 
 
+import asyncio
+import json
+import threading
+import time
 import unittest
 from unittest.mock import patch, Mock, PropertyMock
 from parameterized import parameterized, param
-from utils import access_nested_map, get_json, memoize
+from utils import (SingleFlight, access_nested_map, async_get_json,
+                   async_memoize,
+                   clear_memoized, compile_path, get_json, iter_json_array,
+                   iter_json_items, iter_json_pages, memoize)
 from typing import Mapping, Sequence, Any, Dict, Callable
 
 
@@ -75,6 +90,75 @@ class TestAccessNestedMap(unittest.TestCase):
         self.assertEqual(cm.msg, f"KeyError: ('{key}')")
 
 
+class TestCompilePath(unittest.TestCase):
+    """
+    Test case for the accessors built by compile_path.
+    """
+
+    @parameterized.expand([
+        param(nested_map={"a": {"b": 2}}, path=("a", "b"), expected=2),
+        param(nested_map={"a": [{"b": 1}, {"b": 2}]}, path=("a", 1, "b"),
+              expected=2),
+        param(nested_map={"a": [{"b": 1}, {"b": 2}]}, path=("a", "*", "b"),
+              expected=[1, 2]),
+        param(nested_map={"a": {"x": {"b": 1}, "y": {"b": 2}}},
+              path=("a", "*", "b"), expected=[1, 2]),
+    ])
+    def test_compile_path(self, nested_map: Mapping, path: Sequence,
+                          expected: Any) -> None:
+        """
+        Test the accessor with keys, indexes and wildcards.
+
+        Args:
+            nested_map (Mapping): The nested map to access.
+            path (Sequence): The path to the desired value.
+            expected (Any): The expected value.
+
+        Returns:
+            None
+        """
+        self.assertEqual(compile_path(path)(nested_map), expected)
+
+    @parameterized.expand([
+        param(nested_map={}, path=("a",), key="a"),
+        param(nested_map={"a": 1}, path=("a", "b"), key="b"),
+        param(nested_map={"a": None}, path=("a", "b"), key="b"),
+        param(nested_map={"a": [1]}, path=("a", 3), key=3),
+        param(nested_map={"a": [{"b": 1}, {}]}, path=("a", "*", "b"),
+              key="b"),
+    ])
+    def test_compile_path_exception(self, nested_map: Mapping,
+                                    path: Sequence, key: Any) -> None:
+        """
+        Test that a missing path raises KeyError, or gives the default.
+
+        Args:
+            nested_map (Mapping): The nested map to access.
+            path (Sequence): The path to the desired value.
+            key (Any): The key that should raise KeyError.
+
+        Returns:
+            None
+        """
+        with self.assertRaises(KeyError) as cm:
+            compile_path(path)(nested_map)
+        self.assertEqual(cm.exception.args, (key,))
+        self.assertEqual(compile_path(path, default=0)(nested_map),
+                         [1, 0] if "*" in path else 0)
+
+    def test_extract(self) -> None:
+        """
+        Test the batch form of the accessor.
+
+        Returns:
+            None
+        """
+        records = [{"license": {"key": "mit"}}, {"license": None}]
+        self.assertEqual(
+            compile_path(("license", "key"), default=None).extract(records),
+            ["mit", None])
+
+
 class TestGetJson(unittest.TestCase):
     """
     Test case for the get_json function.
@@ -95,7 +179,7 @@ class TestGetJson(unittest.TestCase):
         Returns:
             None
         """
-        with patch('requests.get') as mock_get:
+        with patch('requests.Session.get') as mock_get:
             # Create a mock response object with the desired properties
             mock_res = Mock()
             mock_res.json.return_value = payload
@@ -103,9 +187,197 @@ class TestGetJson(unittest.TestCase):
 
             json_response = get_json(url)
 
-            mock_get.assert_called_once_with(url)
+            mock_get.assert_called_once()
+            self.assertEqual(mock_get.call_args[0], (url,))
             self.assertEqual(json_response, payload)
 
+    def test_get_json_custom_transport(self) -> None:
+        """
+        Test that get_json sends the request through the given transport.
+
+        Returns:
+            None
+        """
+        transport = Mock()
+        transport.get.return_value.json.return_value = {"payload": True}
+
+        self.assertEqual(get_json("http://example.com", transport),
+                         {"payload": True})
+        transport.get.assert_called_once_with("http://example.com")
+
+
+class TestIterJsonPages(unittest.TestCase):
+    """
+    Test case for the iter_json_pages generator.
+    """
+
+    def test_iter_json_pages(self) -> None:
+        """
+        Test that every page is yielded by following the next links,
+        and that the query parameters are only sent once.
+
+        Returns:
+            None
+        """
+        first, last = Mock(), Mock()
+        first.json.return_value = [1, 2]
+        first.links = {"next": {"url": "http://example.com?page=2"}}
+        last.json.return_value = [3]
+        last.links = {}
+
+        transport = Mock(**{'get.side_effect': [first, last]})
+        mock_get = transport.get
+        pages = list(iter_json_pages("http://example.com",
+                                     {"per_page": 2}, transport))
+
+        self.assertEqual(pages, [[1, 2], [3]])
+        mock_get.assert_any_call("http://example.com",
+                                 params={"per_page": 2})
+        mock_get.assert_called_with("http://example.com?page=2",
+                                    params=None)
+
+    def test_iter_json_pages_is_lazy(self) -> None:
+        """
+        Test that the next page is not fetched until it is needed.
+
+        Returns:
+            None
+        """
+        first = Mock()
+        first.json.return_value = [1, 2]
+        first.links = {"next": {"url": "http://example.com?page=2"}}
+
+        transport = Mock(**{'get.return_value': first})
+        pages = iter_json_pages("http://example.com", transport=transport)
+        self.assertEqual(next(pages), [1, 2])
+
+        transport.get.assert_called_once()
+
+
+class TestIterJsonArray(unittest.TestCase):
+    """
+    Test case for the iter_json_array generator.
+    """
+
+    ITEMS = [{"name": "caf\u00e9", "license": {"key": "mit", "id": 1}},
+             {"name": "b", "license": None}, 12345, "x", [], None,
+             0.1, 1e-07, -2.5e+30]
+
+    @parameterized.expand([
+        param(chunk_size=1),
+        param(chunk_size=7),
+        param(chunk_size=4096),
+    ])
+    def test_iter_json_array(self, chunk_size: int) -> None:
+        """
+        Test that the array is decoded whatever the chunk boundaries,
+        multi-byte characters and numbers included.
+
+        Args:
+            chunk_size (int): The size of each chunk of the document.
+
+        Returns:
+            None
+        """
+        document = json.dumps(self.ITEMS, ensure_ascii=False,
+                              indent=1).encode()
+        chunks = [document[i:i + chunk_size]
+                  for i in range(0, len(document), chunk_size)]
+
+        self.assertEqual(list(iter_json_array(chunks)), self.ITEMS)
+
+    def test_iter_json_array_split_numbers(self) -> None:
+        """
+        Test that floats and exponents cut at every offset decode whole.
+
+        Returns:
+            None
+        """
+        document = b'[0.1, 1e-07, 12, -2.5e+30]'
+        for offset in range(1, len(document)):
+            with self.subTest(offset=offset):
+                self.assertEqual(
+                    list(iter_json_array([document[:offset],
+                                          document[offset:]])),
+                    [0.1, 1e-07, 12, -2.5e+30])
+
+    def test_iter_json_array_fields(self) -> None:
+        """
+        Test that only the projected key paths are kept.
+
+        Returns:
+            None
+        """
+        document = json.dumps(self.ITEMS[:2]).encode()
+
+        self.assertEqual(
+            list(iter_json_array([document],
+                                 fields=[("name",), ("license", "key")])),
+            [{"name": "caf\u00e9", "license": {"key": "mit"}},
+             {"name": "b"}])
+
+    @parameterized.expand([
+        param(document=b'[]', expected=[]),
+        param(document=b' [ 1 ] ', expected=[1]),
+    ])
+    def test_iter_json_array_edge_cases(self, document: bytes,
+                                        expected: list) -> None:
+        """
+        Test empty arrays and surrounding whitespace.
+
+        Args:
+            document (bytes): The JSON document.
+            expected (list): The expected items.
+
+        Returns:
+            None
+        """
+        self.assertEqual(list(iter_json_array([document])), expected)
+
+    @parameterized.expand([
+        param(document=b'{"a": 1}'),
+        param(document=b'[1 2]'),
+        param(document=b'[1, {"a": '),
+        param(document=b'[1,'),
+    ])
+    def test_iter_json_array_invalid(self, document: bytes) -> None:
+        """
+        Test that malformed documents raise a JSONDecodeError.
+
+        Args:
+            document (bytes): The malformed JSON document.
+
+        Returns:
+            None
+        """
+        with self.assertRaises(json.JSONDecodeError):
+            list(iter_json_array([document]))
+
+    def test_iter_json_items(self) -> None:
+        """
+        Test that every page is streamed and closed.
+
+        Returns:
+            None
+        """
+        first, last = Mock(), Mock()
+        first.iter_content.return_value = [b'[{"name": "a"}, ',
+                                           b'{"name": "b"}]']
+        first.links = {"next": {"url": "http://example.com?page=2"}}
+        last.iter_content.return_value = [b'[{"name": "c"}]']
+        last.links = {}
+        transport = Mock(**{'get.side_effect': [first, last]})
+
+        items = list(iter_json_items("http://example.com",
+                                     transport=transport))
+
+        self.assertEqual(items, [{"name": "a"}, {"name": "b"},
+                                 {"name": "c"}])
+        transport.get.assert_any_call("http://example.com", params=None,
+                                      stream=True)
+        first.close.assert_called_once()
+        last.close.assert_called_once()
+
 
 class TestMemoize(unittest.TestCase):
     """
@@ -159,6 +431,329 @@ class TestMemoize(unittest.TestCase):
 
             mock_prop.assert_called_once()
 
+    class Counter:
+        """
+        This is a test class counting how often its properties are computed.
+        """
+
+        def __init__(self) -> None:
+            """
+            Start with no call.
+            """
+            self.calls = 0
+
+        @memoize(ttl=10)
+        def with_ttl(self) -> int:
+            """
+            This property expires 10 seconds after being computed.
+            """
+            self.calls += 1
+            return self.calls
+
+        @memoize(maxsize=2)
+        def with_lru(self) -> int:
+            """
+            This property is kept in a shared LRU of 2 instances.
+            """
+            self.calls += 1
+            return self.calls
+
+    def test_memoize_ttl(self) -> None:
+        """
+        Test that a memoized value is computed again once expired.
+
+        Returns:
+            None
+        """
+        test_object = self.Counter()
+        with patch('time.monotonic', return_value=100):
+            self.assertEqual(test_object.with_ttl, 1)
+        with patch('time.monotonic', return_value=109):
+            self.assertEqual(test_object.with_ttl, 1)
+        with patch('time.monotonic', return_value=110):
+            self.assertEqual(test_object.with_ttl, 2)
+
+    def test_memoize_invalidation(self) -> None:
+        """
+        Test that del and clear_memoized forget the memoized values.
+
+        Returns:
+            None
+        """
+        test_object = self.Counter()
+        self.assertIsNone(self.Counter.with_ttl.peek(test_object))
+        self.assertEqual(test_object.with_ttl, 1)
+        self.assertEqual(self.Counter.with_ttl.peek(test_object), 1)
+        del test_object.with_ttl
+        self.assertEqual(test_object.with_ttl, 2)
+        self.assertEqual(test_object.with_lru, 3)
+        clear_memoized(test_object)
+        self.assertEqual(test_object.with_lru, 4)
+        self.assertEqual(test_object.with_ttl, 5)
+
+    def test_memoize_lru(self) -> None:
+        """
+        Test that the shared LRU evicts the least recently used instance
+        and counts hits and misses.
+
+        Returns:
+            None
+        """
+        self.Counter.with_lru.cache_clear()
+        first, second, third = self.Counter(), self.Counter(), self.Counter()
+        for test_object in (first, second, first, third, first, second):
+            test_object.with_lru
+
+        self.assertEqual((first.calls, second.calls, third.calls),
+                         (1, 2, 1))
+        self.assertEqual(self.Counter.with_lru.cache_info(),
+                         {"hits": 2, "misses": 4, "size": 2,
+                          "maxsize": 2, "ttl": None})
+
+    def test_memoize_threadsafe(self) -> None:
+        """
+        Test that concurrent first reads compute the value only once.
+
+        Returns:
+            None
+        """
+        class TestClass:
+            """
+            This is a test class with a slow thread-safe property.
+            """
+            calls = 0
+
+            @memoize(threadsafe=True)
+            def a_property(self) -> int:
+                """
+                This property waits a bit, then returns 42.
+                """
+                TestClass.calls += 1
+                time.sleep(0.01)
+                return 42
+
+        test_object = TestClass()
+        results = []
+        threads = [threading.Thread(
+            target=lambda: results.append(test_object.a_property))
+            for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [42] * 8)
+        self.assertEqual(TestClass.calls, 1)
+
+
+class TestSingleFlight(unittest.TestCase):
+    """
+    Test case for the SingleFlight class.
+    """
+
+    def run_threads(self, count: int, target: Callable) -> None:
+        """
+        Run target from count threads started together.
+        """
+        barrier = threading.Barrier(count)
+
+        def run():
+            """Wait for every thread, then run target"""
+            barrier.wait()
+            target()
+
+        threads = [threading.Thread(target=run) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_do(self) -> None:
+        """
+        Test that concurrent calls of a key run once and share the result.
+
+        Returns:
+            None
+        """
+        flights = SingleFlight()
+        calls, results = [], []
+
+        def fetch(url):
+            """Slow fake fetch"""
+            calls.append(url)
+            time.sleep(0.05)
+            return {"url": url}
+
+        self.run_threads(6, lambda: results.append(
+            flights.do("a", fetch, "http://a")))
+
+        self.assertEqual(calls, ["http://a"])
+        self.assertEqual(results, [{"url": "http://a"}] * 6)
+        self.assertEqual(flights.stats(),
+                         {"calls": 1, "saved": 5, "in_flight": 0})
+        flights.do("a", fetch, "http://a")
+        self.assertEqual(len(calls), 2)
+
+    def test_do_shares_exceptions(self) -> None:
+        """
+        Test that every waiter gets the exception of the shared call.
+
+        Returns:
+            None
+        """
+        flights = SingleFlight()
+        errors = []
+
+        def fail():
+            """Slow failing fake fetch"""
+            time.sleep(0.05)
+            raise ConnectionError("down")
+
+        def call():
+            """Record the error raised by the shared call"""
+            try:
+                flights.do("a", fail)
+            except ConnectionError as error:
+                errors.append(error)
+
+        self.run_threads(3, call)
+
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(flights.stats()["calls"], 1)
+
+    def test_do_async(self) -> None:
+        """
+        Test that asyncio tasks share the call of the same key.
+
+        Returns:
+            None
+        """
+        flights = SingleFlight()
+        calls = []
+
+        def fetch():
+            """Slow fake fetch"""
+            calls.append(1)
+            time.sleep(0.05)
+            return 42
+
+        async def main():
+            """Await the same key from several tasks"""
+            return await asyncio.gather(
+                *[flights.do_async("a", fetch) for _ in range(4)])
+
+        self.assertEqual(asyncio.run(main()), [42] * 4)
+        self.assertEqual(calls, [1])
+
+    def test_get_json_single_flight(self) -> None:
+        """
+        Test that concurrent get_json calls of a URL send one request.
+
+        Returns:
+            None
+        """
+        def get(url):
+            """Slow fake request"""
+            time.sleep(0.05)
+            return Mock(**{'json.return_value': {"url": url}})
+
+        transport = Mock(**{'get.side_effect': get})
+        results = []
+        self.run_threads(4, lambda: results.append(
+            get_json("http://example.com", transport)))
+
+        transport.get.assert_called_once_with("http://example.com")
+        self.assertEqual(results, [{"url": "http://example.com"}] * 4)
+
+
+class TestAsyncGetJson(unittest.TestCase):
+    """
+    Test case for the async_get_json coroutine.
+    """
+
+    def test_async_get_json(self) -> None:
+        """
+        Test that async_get_json returns the JSON payload of the URL.
+
+        Returns:
+            None
+        """
+        transport = Mock()
+        transport.get.return_value.json.return_value = {"payload": True}
+
+        payload = asyncio.run(async_get_json("http://example.com",
+                                             transport))
+
+        self.assertEqual(payload, {"payload": True})
+        transport.get.assert_called_once_with("http://example.com")
+
+
+class TestAsyncMemoize(unittest.TestCase):
+    """
+    Test case for the async_memoize decorator.
+    """
+
+    class TestClass:
+        """
+        This is a test class counting the calls of its coroutine.
+        """
+
+        def __init__(self) -> None:
+            """
+            Start with no call and no pending failure.
+            """
+            self.calls = 0
+            self.fail = False
+
+        @async_memoize
+        async def a_method(self) -> int:
+            """
+            This coroutine returns the value 42 after yielding control.
+            """
+            self.calls += 1
+            await asyncio.sleep(0)
+            if self.fail:
+                raise ValueError("failed")
+            return 42
+
+    def test_concurrent_awaits_coalesce(self) -> None:
+        """
+        Test that concurrent and later awaits share one call.
+
+        Returns:
+            None
+        """
+        test_object = self.TestClass()
+
+        async def main():
+            """Await the method concurrently, then once more"""
+            results = await asyncio.gather(
+                *[test_object.a_method() for _ in range(5)])
+            return results + [await test_object.a_method()]
+
+        self.assertEqual(asyncio.run(main()), [42] * 6)
+        self.assertEqual(test_object.calls, 1)
+
+    def test_failure_is_not_memoized(self) -> None:
+        """
+        Test that a failed call is retried on the next await.
+
+        Returns:
+            None
+        """
+        test_object = self.TestClass()
+        test_object.fail = True
+
+        async def main():
+            """Fail once, then succeed"""
+            with self.assertRaises(ValueError):
+                await test_object.a_method()
+            test_object.fail = False
+            return await test_object.a_method()
+
+        self.assertEqual(asyncio.run(main()), 42)
+        self.assertEqual(test_object.calls, 2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Pooled HTTP transport for the github org client.
+"""
+import threading
+import time
+from typing import (
+    Dict,
+    Optional,
+    Tuple,
+    Union,
+)
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metrics
+from cache import CachedResponse, ResponseCache
+from ratelimit import RateLimiter
+
+__all__ = [
+    "HTTPTransport",
+    "get_transport",
+    "set_transport",
+]
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class HTTPTransport:
+    """Keep-alive HTTP transport backed by a shared connection pool.
+    Every thread gets its own `requests.Session`, but all of them are
+    mounted on the same adapter, so TCP/TLS connections are reused across
+    threads and across `GithubOrgClient` instances.
+    Parameters
+    ----------
+    pool_connections: int
+        number of hosts to keep a connection pool for
+    pool_maxsize: int
+        maximum number of connections kept alive per host
+    pool_block: bool
+        wait for a free connection instead of opening an extra one
+    timeout: float or (connect, read) tuple
+        default timeout of every request, in seconds
+    retries: int
+        retries on connection errors and retryable status codes
+    backoff_factor: float
+        sleep ``backoff_factor * 2 ** (retry - 1)`` seconds between retries
+    base_url: str
+        when set, scheme and host of every URL are replaced by this one,
+        e.g. to point the client at a local stub server
+    cache: ResponseCache
+        when set, responses carrying an ETag or Last-Modified header are
+        kept and revalidated with conditional requests; a ``304 Not
+        Modified`` answer is served from the cache, and so is any entry
+        younger than the cache's ttl, without a request
+    rate_limiter: RateLimiter
+        when set, every request waits for its go-ahead and reports the
+        rate-limit headers of its response
+    Example
+    -------
+    >>> transport = HTTPTransport(pool_maxsize=4, timeout=2)
+    >>> transport.get("https://api.github.com/orgs/google").status_code
+    200
+    """
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10,
+                 pool_block: bool = False, timeout: Timeout = (3.05, 10),
+                 retries: int = 3, backoff_factor: float = 0.3,
+                 base_url: Optional[str] = None,
+                 cache: Optional[ResponseCache] = None,
+                 rate_limiter: Optional[RateLimiter] = None) -> None:
+        """Init method of HTTPTransport"""
+        self.timeout = timeout
+        self.base_url = base_url
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=Retry(total=retries,
+                              backoff_factor=backoff_factor,
+                              status_forcelist=self.RETRY_STATUSES,
+                              raise_on_status=False),
+        )
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        """Session of the calling thread, mounted on the shared pool"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", self._adapter)
+            session.mount("https://", self._adapter)
+            self._local.session = session
+        return session
+
+    def _rewrite(self, url: str) -> str:
+        """Point url at base_url, if any"""
+        if self.base_url is None:
+            return url
+        base = urlsplit(self.base_url)
+        parts = urlsplit(url)
+        return urlunsplit((base.scheme, base.netloc,
+                           base.path.rstrip("/") + parts.path,
+                           parts.query, parts.fragment))
+
+    def _send(self, url: str, params: Optional[Dict],
+              headers: Optional[Dict],
+              stream: bool = False) -> requests.Response:
+        """Send a request once the rate limiter allows it"""
+        registry = metrics.get_registry()
+        if self.rate_limiter is not None:
+            waited = self.rate_limiter.acquire()
+            if registry.enabled:
+                registry.observe("ratelimit.wait.seconds", waited)
+        started_at = time.perf_counter() if registry.enabled else 0.0
+        response = self.session.get(url, params=params, headers=headers,
+                                    timeout=self.timeout, stream=stream)
+        if registry.enabled:
+            self._observe(registry, url, response, stream,
+                          time.perf_counter() - started_at)
+        if self.rate_limiter is not None:
+            self.rate_limiter.update(response)
+        return response
+
+    @staticmethod
+    def _observe(registry: metrics.MetricsRegistry, url: str,
+                 response: requests.Response, stream: bool,
+                 elapsed: float) -> None:
+        """Record latency, size, status and retries of a response"""
+        url = url.split("?", 1)[0]
+        registry.observe("http.request.seconds", elapsed, url=url)
+        if stream:
+            size = int(response.headers.get("Content-Length") or 0)
+        else:
+            size = len(response.content)
+        registry.observe("http.response.bytes", size, url=url)
+        registry.increment("http.requests", status=response.status_code)
+        retries = getattr(response.raw, "retries", None)
+        if retries is not None and retries.history:
+            registry.increment("http.retries", len(retries.history))
+
+    def _record_cache(self, hit: bool) -> None:
+        """Count a cache lookup, in the cache and the metrics"""
+        self.cache.record(hit)
+        registry = metrics.get_registry()
+        if registry.enabled:
+            registry.increment("http.cache",
+                               result="hit" if hit else "miss")
+
+    def get(self, url: str, params: Optional[Dict] = None,
+            headers: Optional[Dict] = None,
+            stream: bool = False) -> requests.Response:
+        """Send a GET request through the pool.
+        With stream, the body is left unread for the caller to iterate,
+        and the response cache is not used."""
+        url = self._rewrite(url)
+        if self.cache is None or stream:
+            return self._send(url, params, headers, stream)
+
+        key = requests.Request("GET", url, params=params).prepare().url
+        cached = self.cache.get(key)
+        if cached is not None and self.cache.fresh(cached):
+            self._record_cache(hit=True)
+            return cached.to_response()
+        if cached is not None:
+            headers = dict(headers or {}, **cached.validators())
+        response = self._send(url, params, headers)
+        if cached is not None and response.status_code == 304:
+            self._record_cache(hit=True)
+            self.cache.set(key, cached._replace(stored_at=time.time()))
+            return cached.to_response()
+
+        self._record_cache(hit=False)
+        entry = CachedResponse.from_response(response)
+        if entry is not None:
+            self.cache.set(key, entry)
+        return response
+
+    def close(self) -> None:
+        """Close every pooled connection"""
+        self._adapter.close()
+
+    def __enter__(self) -> "HTTPTransport":
+        """Use the transport as a context manager"""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the pool on exit"""
+        self.close()
+
+
+_default_transport: Optional[HTTPTransport] = None
+_default_lock = threading.Lock()
+
+
+def get_transport() -> HTTPTransport:
+    """Return the process-wide transport, creating it on first use.
+    Its response cache and rate limiter are shared by every client using
+    the default.
+    """
+    global _default_transport
+    if _default_transport is None:
+        with _default_lock:
+            if _default_transport is None:
+                _default_transport = HTTPTransport(
+                    cache=ResponseCache(), rate_limiter=RateLimiter())
+    return _default_transport
+
+
+def set_transport(transport: Optional[HTTPTransport]) -> \
+        Optional[HTTPTransport]:
+    """Replace the process-wide transport and return the previous one.
+    Any object with a compatible
+    ``get(url, params=None, headers=None, stream=False)``
+    method can be injected, e.g. a fake for tests. Passing None resets to
+    a fresh `HTTPTransport`, with an empty response cache, on next use.
+    """
+    global _default_transport
+    with _default_lock:
+        previous, _default_transport = _default_transport, transport
+    return previous
@@ -1,22 +1,58 @@
 #!/usr/bin/env python3
 """Generic utilities for github org client.
 """
-import requests
-from functools import wraps
+import asyncio
+import codecs
+import json
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import partial, update_wrapper, wraps
 from typing import (
     Mapping,
     Sequence,
     Any,
     Dict,
     Callable,
+    Coroutine,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
 )
 
+import metrics
+from transport import HTTPTransport, get_transport
+
 __all__ = [
+    "ExpiringMemoized",
+    "Memoized",
+    "PathAccessor",
+    "SingleFlight",
+    "WILDCARD",
     "access_nested_map",
+    "async_get_json",
+    "async_memoize",
+    "clear_memoized",
+    "compile_path",
     "get_json",
+    "iter_json_array",
+    "iter_json_items",
+    "iter_json_pages",
     "memoize",
+    "single_flight",
 ]
 
+_MISSING = object()
+WILDCARD = "*"
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_END = ", \t\n\r]"
+
 
 def access_nested_map(nested_map: Mapping, path: Sequence) -> Any:
     """Access nested map with key path.
@@ -40,15 +76,556 @@ def access_nested_map(nested_map: Mapping, path: Sequence) -> Any:
     return nested_map
 
 
-def get_json(url: str) -> Dict:
+class PathAccessor:
+    """Key path compiled once, to read the same nested value from many
+    maps; see `compile_path`.
+    """
+    __slots__ = ("path", "default", "_wildcard")
+
+    def __init__(self, path: Sequence, default: Any = _MISSING) -> None:
+        """Init method of PathAccessor"""
+        self.path = tuple(path)
+        self.default = default
+        self._wildcard = WILDCARD in self.path
+
+    def __call__(self, nested_map: Any) -> Any:
+        """Value at path in nested_map"""
+        if self._wildcard:
+            return self._walk(nested_map, 0)
+        node = nested_map
+        try:
+            for key in self.path:
+                node = node[key]
+        except (KeyError, IndexError, TypeError):
+            if self.default is _MISSING:
+                raise KeyError(key) from None
+            return self.default
+        return node
+
+    def _walk(self, node: Any, start: int) -> Any:
+        """Value at path[start:] in node, fanning out on wildcards"""
+        for position in range(start, len(self.path)):
+            key = self.path[position]
+            if key == WILDCARD:
+                children = node.values() if isinstance(node, Mapping) \
+                    else node
+                if isinstance(children, (str, bytes)):
+                    return self._missing(key)
+                try:
+                    return [self._walk(child, position + 1)
+                            for child in children]
+                except TypeError:
+                    return self._missing(key)
+            try:
+                node = node[key]
+            except (KeyError, IndexError, TypeError):
+                return self._missing(key)
+        return node
+
+    def _missing(self, key: Any) -> Any:
+        """Default value, or KeyError if there is none"""
+        if self.default is _MISSING:
+            raise KeyError(key)
+        return self.default
+
+    def extract(self, records: Iterable) -> List:
+        """Value at path in each of the records"""
+        return list(map(self, records))
+
+    def __repr__(self) -> str:
+        """Representation of the accessor"""
+        return "{}({!r})".format(type(self).__name__, self.path)
+
+
+def compile_path(path: Sequence, default: Any = _MISSING) -> PathAccessor:
+    """Compile a key path into a reusable accessor.
+    Unlike `access_nested_map`, the accessor does no per-level type check:
+    a missing key, out of range index or non-container level raises
+    KeyError, or returns `default` when one is given. Integer segments
+    index sequences, and a ``"*"`` segment maps the rest of the path over
+    every item of a sequence or value of a mapping.
+    Parameters
+    ----------
+    path: Sequence
+        a sequence of key representing a path to the value
+    default: Any
+        value returned when the path does not exist
+    Example
+    -------
+    >>> license_key = compile_path(("license", "key"), default=None)
+    >>> license_key({"license": {"key": "mit"}})
+    'mit'
+    >>> license_key.extract([{"license": None}, {"license": {"key": "bsd"}}])
+    [None, 'bsd']
+    >>> compile_path(("topics", 0))({"topics": ["python", "http"]})
+    'python'
+    >>> compile_path(("owners", "*", "login"))(
+    ...     {"owners": [{"login": "a"}, {"login": "b"}]})
+    ['a', 'b']
+    """
+    return PathAccessor(path, default)
+
+
+class SingleFlight:
+    """Deduplicate identical calls in flight at the same time.
+    The first caller of a key runs the call; callers of the same key,
+    from any thread or asyncio task, arriving before it completes wait
+    for it and share its result or exception.
+    Example
+    -------
+    >>> flights = SingleFlight()
+    >>> flights.do("google", get_json, "https://api.github.com/orgs/google")
+    {'login': 'google', ...}
+    >>> flights.stats()
+    {'calls': 1, 'saved': 0, 'in_flight': 0}
+    """
+
+    def __init__(self) -> None:
+        """Init method of SingleFlight"""
+        self.calls = 0
+        self.saved = 0
+        self._flights: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        """Future of the call of key, and whether the caller must run it"""
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                self.saved += 1
+                return future, False
+            future = Future()
+            # a running future cannot be cancelled by one of its waiters
+            future.set_running_or_notify_cancel()
+            self._flights[key] = future
+            self.calls += 1
+            return future, True
+
+    def _run(self, key: Hashable, future: Future, fn: Callable,
+             *args: Any) -> None:
+        """Run the call of key and hand its outcome to the waiters"""
+        try:
+            future.set_result(fn(*args))
+        except BaseException as error:
+            future.set_exception(error)
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+    def do(self, key: Hashable, fn: Callable, *args: Any) -> Any:
+        """Result of fn(*args), shared with concurrent calls of key"""
+        future, leader = self._join(key)
+        if leader:
+            self._run(key, future, fn, *args)
+        return future.result()
+
+    async def do_async(self, key: Hashable, fn: Callable,
+                       *args: Any) -> Any:
+        """Result of fn(*args), run in the loop's default executor and
+        shared with concurrent calls of key"""
+        future, leader = self._join(key)
+        if leader:
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(None, partial(self._run, key, future, fn,
+                                               *args))
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, int]:
+        """Calls run, calls saved by sharing, and calls in flight"""
+        return {"calls": self.calls, "saved": self.saved,
+                "in_flight": len(self._flights)}
+
+
+single_flight = SingleFlight()
+
+
+def _fetch_json(url: str, transport: HTTPTransport) -> Dict:
+    """JSON body of url"""
+    return transport.get(url).json()
+
+
+def get_json(url: str, transport: Optional[HTTPTransport] = None) -> Dict:
     """Get JSON from remote URL.
+    The request goes through `transport`, or the shared pooled transport
+    when none is given. Concurrent calls for the same URL share a single
+    request, see `single_flight`.
+    """
+    transport = transport or get_transport()
+    registry = metrics.get_registry()
+    if not registry.enabled:
+        return single_flight.do((url, transport), _fetch_json, url,
+                                transport)
+    started_at = time.perf_counter()
+    try:
+        return single_flight.do((url, transport), _fetch_json, url,
+                                transport)
+    finally:
+        registry.observe("get_json.seconds",
+                         time.perf_counter() - started_at, url=url)
+
+
+async def async_get_json(url: str,
+                         transport: Optional[HTTPTransport] = None) -> Dict:
+    """Get JSON from remote URL without blocking the event loop.
+    The blocking request runs in the loop's default executor, so it still
+    benefits from the pooled transport, and is shared with concurrent
+    `get_json` and `async_get_json` calls for the same URL.
+    """
+    transport = transport or get_transport()
+    return await single_flight.do_async((url, transport), _fetch_json,
+                                        url, transport)
+
+
+def _fetch_page(url: str, params: Optional[Dict],
+                transport: HTTPTransport) -> Tuple[Any, Optional[str]]:
+    """JSON body of a page and URL of the next one"""
+    response = transport.get(url, params=params)
+    return response.json(), response.links.get("next", {}).get("url")
+
+
+def iter_json_pages(url: str, params: Optional[Dict] = None,
+                    transport: Optional[HTTPTransport] = None) -> Iterator:
+    """Lazily yield the JSON body of every page of a paginated resource.
+    The next page is only requested once the caller asks for it, by
+    following the ``Link: <...>; rel="next"`` response header. Concurrent
+    fetches of the same page share a single request.
+    Parameters
+    ----------
+    url: str
+        URL of the first page
+    params: Dict
+        query parameters sent with the first request only, the ``next``
+        links already carry them
+    transport: HTTPTransport
+        transport to use instead of the shared one
+    Example
+    -------
+    >>> for page in iter_json_pages(repos_url, {"per_page": 100}):
+    ...     print(len(page))
+    100
+    42
+    """
+    transport = transport or get_transport()
+    while url:
+        key = (url, tuple(sorted((params or {}).items())), transport)
+        page, url = single_flight.do(key, _fetch_page, url, params,
+                                     transport)
+        yield page
+        params = None
+
+
+def _projection(fields: Sequence[Sequence]) -> Callable[[Dict], Dict]:
+    """Function keeping only the given key paths of a record"""
+    accessors = [(tuple(path), compile_path(path)) for path in fields]
+
+    def project(record: Dict) -> Dict:
+        """Copy of record restricted to the projected key paths"""
+        projected: Dict = {}
+        for path, accessor in accessors:
+            try:
+                value = accessor(record)
+            except KeyError:
+                continue
+            node = projected
+            for key in path[:-1]:
+                node = node.setdefault(key, {})
+            node[path[-1]] = value
+        return projected
+
+    return project
+
+
+def iter_json_array(chunks: Iterable[bytes],
+                    fields: Optional[Sequence[Sequence]] = None) -> Iterator:
+    """Incrementally decode a JSON array, yielding one item at a time.
+    Only the item being decoded and the current chunk are held in memory,
+    whatever the size of the whole array.
+    Parameters
+    ----------
+    chunks: Iterable[bytes]
+        UTF-8 encoded JSON document, in pieces of any size
+    fields: Sequence[Sequence]
+        key paths to keep in each item, all other keys are dropped
+    Example
+    -------
+    >>> list(iter_json_array([b'[{"name": "a", "id"', b': 1}, {"name": "b"}]'],
+    ...                      fields=[("name",)]))
+    [{'name': 'a'}, {'name': 'b'}]
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    project = _projection(fields) if fields is not None else None
+    chunks = iter(chunks)
+    buffer, pos, exhausted = "", 0, False
+
+    def fill() -> None:
+        """Append the next chunk to what is left of the buffer"""
+        nonlocal buffer, pos, exhausted
+        if exhausted:
+            raise json.JSONDecodeError("Unterminated array", buffer, pos)
+        chunk = next(chunks, None)
+        exhausted = chunk is None
+        text = text_decoder.decode(chunk or b"", final=exhausted)
+        buffer, pos = buffer[pos:] + text, 0
+
+    def peek() -> str:
+        """Skip whitespace and return the next character"""
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer):
+                return buffer[pos]
+            fill()
+
+    if peek() != "[":
+        raise json.JSONDecodeError("Expecting '['", buffer, pos)
+    pos += 1
+    if peek() == "]":
+        return
+    while True:
+        peek()
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise
+                fill()
+                continue
+            # a number cut by a chunk ("0.", "1e-") decodes as a shorter
+            # one, so it is only complete once a delimiter follows it
+            if exhausted or not isinstance(item, (int, float)) or \
+                    end < len(buffer) and buffer[end] in _NUMBER_END:
+                break
+            fill()
+        pos = end
+        yield item if project is None else project(item)
+        char = peek()
+        if char == "]":
+            return
+        if char != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter",
+                                       buffer, pos)
+        pos += 1
+
+
+def iter_json_items(url: str, params: Optional[Dict] = None,
+                    fields: Optional[Sequence[Sequence]] = None,
+                    transport: Optional[HTTPTransport] = None,
+                    chunk_size: int = 64 * 1024) -> Iterator:
+    """Lazily yield the items of a paginated JSON array resource, decoding
+    each page as its body streams in; see `iter_json_array`.
+    Streamed responses bypass the transport's response cache.
+    Example
+    -------
+    >>> for repo in iter_json_items(repos_url, {"per_page": 100},
+    ...                             fields=[("name",), ("license", "key")]):
+    ...     print(repo)
+    {'name': 'episodes.dart', 'license': {'key': 'bsd-3-clause'}}
+    """
+    transport = transport or get_transport()
+    while url:
+        response = transport.get(url, params=params, stream=True)
+        try:
+            yield from iter_json_array(response.iter_content(chunk_size),
+                                       fields)
+        finally:
+            response.close()
+        url = response.links.get("next", {}).get("url")
+        params = None
+
+
+class Memoized:
+    """Property caching the result of a method, see `memoize`.
+    Like `functools.cached_property`, the value is stored in the instance
+    `__dict__` under the property name, so later reads never reach the
+    descriptor and `del obj.attr` forgets it. Such hits are not counted.
+    """
+
+    def __init__(self, fn: Callable, ttl: Optional[float] = None,
+                 maxsize: Optional[int] = None,
+                 threadsafe: bool = False) -> None:
+        """Init method of Memoized"""
+        update_wrapper(self, fn)
+        self.fn = fn
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.threadsafe = threadsafe
+        self.name = fn.__name__
+        self.attr_name = "_{}".format(fn.__name__)
+        self.expires_name = "{}_expires_at".format(self.attr_name)
+        self.lock_name = "{}_lock".format(self.attr_name)
+        self.hits = 0
+        self.misses = 0
+        self._lru: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lru_lock = threading.Lock()
+        self._locks_lock = threading.Lock()
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        """Remember the name the property is bound to"""
+        self.name = name
+
+    def __get__(self, instance: Any, owner: type = None) -> Any:
+        """Memoized value of instance, computed on a miss"""
+        if instance is None:
+            return self
+        value = self._lookup(instance)
+        if value is not _MISSING:
+            self._hit()
+            return value
+        if not self.threadsafe:
+            return self._compute(instance)
+        with self._instance_lock(instance):
+            # another thread may have computed it while we waited
+            value = self._lookup(instance)
+            if value is not _MISSING:
+                self._hit()
+                return value
+            return self._compute(instance)
+
+    def _hit(self) -> None:
+        """Count a hit"""
+        self.hits += 1
+        registry = metrics.get_registry()
+        if registry.enabled:
+            registry.increment("memoize", name=self.__qualname__,
+                               result="hit")
+
+    def _compute(self, instance: Any) -> Any:
+        """Compute and memoize the value of instance"""
+        self.misses += 1
+        registry = metrics.get_registry()
+        if not registry.enabled:
+            value = self.fn(instance)
+            self._store(instance, value)
+            return value
+        registry.increment("memoize", name=self.__qualname__,
+                           result="miss")
+        started_at = time.perf_counter()
+        try:
+            value = self.fn(instance)
+        finally:
+            registry.observe("memoize.compute.seconds",
+                             time.perf_counter() - started_at,
+                             name=self.__qualname__)
+        self._store(instance, value)
+        return value
+
+    def _instance_lock(self, instance: Any) -> threading.Lock:
+        """Lock serializing the computations for instance"""
+        lock = getattr(instance, self.lock_name, None)
+        if lock is None:
+            with self._locks_lock:
+                lock = getattr(instance, self.lock_name, None)
+                if lock is None:
+                    lock = threading.Lock()
+                    setattr(instance, self.lock_name, lock)
+        return lock
+
+    def forget(self, instance: Any) -> None:
+        """Forget the memoized value of instance"""
+        if self.ttl is None and self.maxsize is None:
+            vars(instance).pop(self.name, None)
+            return
+        if self.maxsize is not None:
+            with self._lru_lock:
+                self._lru.pop(id(instance), None)
+            return
+        for name in (self.attr_name, self.expires_name):
+            if hasattr(instance, name):
+                delattr(instance, name)
+
+    def _expires_at(self) -> Optional[float]:
+        """Expiry date of a value computed now"""
+        if self.ttl is None:
+            return None
+        return time.monotonic() + self.ttl
+
+    def _lookup(self, instance: Any) -> Any:
+        """Fresh memoized value of instance, or _MISSING"""
+        if self.ttl is None and self.maxsize is None:
+            return vars(instance).get(self.name, _MISSING)
+        if self.maxsize is None:
+            value = getattr(instance, self.attr_name, _MISSING)
+            expires_at = getattr(instance, self.expires_name, None)
+        else:
+            with self._lru_lock:
+                entry = self._lru.get(id(instance))
+                # ids are recycled: check the entry is about this instance
+                if entry is None or entry[0]() is not instance:
+                    return _MISSING
+                self._lru.move_to_end(id(instance))
+            ref, value, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            return _MISSING
+        return value
+
+    def _store(self, instance: Any, value: Any) -> None:
+        """Memoize value for instance"""
+        if self.ttl is None and self.maxsize is None:
+            vars(instance)[self.name] = value
+            return
+        expires_at = self._expires_at()
+        if self.maxsize is None:
+            setattr(instance, self.attr_name, value)
+            if expires_at is not None:
+                setattr(instance, self.expires_name, expires_at)
+            return
+        with self._lru_lock:
+            self._lru[id(instance)] = (weakref.ref(instance), value,
+                                       expires_at)
+            self._lru.move_to_end(id(instance))
+            while len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+
+    def peek(self, instance: Any, default: Any = None) -> Any:
+        """Memoized value of instance without computing it on a miss"""
+        value = self._lookup(instance)
+        return default if value is _MISSING else value
+
+    def cache_info(self) -> Dict[str, Any]:
+        """Hit/miss counters, for monitoring"""
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self._lru) if self.maxsize is not None
+                else None,
+                "maxsize": self.maxsize, "ttl": self.ttl}
+
+    def cache_clear(self) -> None:
+        """Empty the shared LRU and reset the counters"""
+        with self._lru_lock:
+            self._lru.clear()
+        self.hits = self.misses = 0
+
+
+class ExpiringMemoized(Memoized):
+    """Memoized property with a `ttl` or a `maxsize`.
+    The value is stored next to its expiry date, or in a process-wide LRU
+    shared by every instance, so every read goes through the descriptor
+    and is counted. `del obj.attr` forgets the value of one instance.
     """
-    response = requests.get(url)
-    return response.json()
+
+    def __delete__(self, instance: Any) -> None:
+        """Forget the memoized value of instance"""
+        self.forget(instance)
 
 
-def memoize(fn: Callable) -> Callable:
+def memoize(fn: Optional[Callable] = None, *, ttl: Optional[float] = None,
+            maxsize: Optional[int] = None,
+            threadsafe: bool = False) -> Callable:
     """Decorator to memoize a method.
+    Parameters
+    ----------
+    ttl: float
+        seconds after which the value is computed again
+    maxsize: int
+        keep values in a process-wide LRU of that many instances instead
+        of on each instance; the instances must support weak references
+    threadsafe: bool
+        compute the value once per instance even when several threads
+        miss at the same time, late arrivals wait for the first one; the
+        memoized fast path takes no lock
+    Without ttl and maxsize, memoized values are plain instance
+    attributes, read at attribute speed; only misses are counted.
     Example
     -------
     class MyClass:
@@ -56,20 +633,71 @@ def memoize(fn: Callable) -> Callable:
         def a_method(self):
             print("a_method called")
             return 42
+
+        @memoize(ttl=60, maxsize=128)
+        def other_method(self):
+            return 0
     >>> my_object = MyClass()
     >>> my_object.a_method
     a_method called
     42
     >>> my_object.a_method
     42
+    >>> del my_object.a_method
+    >>> my_object.a_method
+    a_method called
+    42
+    >>> MyClass.a_method.cache_info()["misses"]
+    2
+    """
+    if fn is None:
+        return partial(memoize, ttl=ttl, maxsize=maxsize,
+                       threadsafe=threadsafe)
+    if ttl is None and maxsize is None:
+        return Memoized(fn, threadsafe=threadsafe)
+    return ExpiringMemoized(fn, ttl=ttl, maxsize=maxsize,
+                            threadsafe=threadsafe)
+
+
+def clear_memoized(obj: Any) -> None:
+    """Forget every memoized value of obj.
+    """
+    for klass in type(obj).__mro__:
+        for name, attr in vars(klass).items():
+            if isinstance(attr, Memoized):
+                attr.forget(obj)
+
+
+def async_memoize(fn: Callable[[Any], Coroutine]) -> Callable:
+    """Decorator to memoize a coroutine method.
+    Concurrent awaits of a method that has not completed yet share one
+    in-flight task instead of each starting their own. A failed or
+    cancelled call is not memoized, the next await retries it.
+    Example
+    -------
+    class MyClass:
+        @async_memoize
+        async def a_method(self):
+            print("a_method called")
+            return 42
+    >>> my_object = MyClass()
+    >>> await asyncio.gather(my_object.a_method(), my_object.a_method())
+    a_method called
+    [42, 42]
+    >>> await my_object.a_method()
+    42
     """
     attr_name = "_{}".format(fn.__name__)
 
     @wraps(fn)
-    def memoized(self):
-        """"memoized wraps"""
-        if not hasattr(self, attr_name):
-            setattr(self, attr_name, fn(self))
-        return getattr(self, attr_name)
+    async def memoized(self):
+        """memoized wraps"""
+        task = getattr(self, attr_name, None)
+        if task is None or task.done() and (
+                task.cancelled() or task.exception() is not None):
+            task = asyncio.ensure_future(fn(self))
+            setattr(self, attr_name, task)
+        # a cancelled waiter must not cancel the fetch shared with others
+        return await asyncio.shield(task)
 
-    return property(memoized)
+    return memoized